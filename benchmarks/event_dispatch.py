@@ -0,0 +1,87 @@
+"""
+Micro-benchmark of the backtest event loop: events per second dispatched by the
+queue.Queue polling loop Backtest.run used before, and by EventQueue and Dispatcher.
+
+Each simulated day streams a data event, whose handler places an order, whose handler
+fills it, so the handlers do no work besides queueing the next event.
+
+    python benchmarks/event_dispatch.py [days]
+"""
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from kaleidoscope.dispatcher import Dispatcher, EventQueue
+from kaleidoscope.event import Event, EventType
+
+EVENTS_PER_DAY = 3
+
+
+class Day(object):
+    def __init__(self, events, days):
+        self.events = events
+        self.days = days
+        self.continue_backtest = True
+
+    def stream_next(self):
+        if not self.days:
+            self.continue_backtest = False
+            return
+
+        self.days -= 1
+        self.events.put(Event(EventType.DATA, self.days))
+
+    def on_data(self, event):
+        self.events.put(Event(EventType.ORDER, event.date))
+
+    def on_order(self, event):
+        self.events.put(Event(EventType.FILL, event.date))
+
+    def on_fill(self, event):
+        pass
+
+
+def polling_loop(days):
+    day = Day(queue.Queue(), days)
+
+    while day.continue_backtest:
+        try:
+            event = day.events.get(False)
+        except queue.Empty:
+            day.stream_next()
+        else:
+            if event is not None:
+                if event.event_type == EventType.DATA:
+                    day.on_data(event)
+                elif event.event_type == EventType.ORDER:
+                    day.on_order(event)
+                elif event.event_type == EventType.FILL:
+                    day.on_fill(event)
+
+
+def dispatch_loop(days):
+    day = Day(EventQueue(), days)
+
+    dispatcher = Dispatcher(day.events)
+    dispatcher.register(EventType.DATA, day.on_data)
+    dispatcher.register(EventType.ORDER, day.on_order)
+    dispatcher.register(EventType.FILL, day.on_fill)
+
+    while day.continue_backtest:
+        dispatcher.dispatch()
+        day.stream_next()
+
+
+def main(days):
+    for name, loop in (("queue.Queue polling", polling_loop), ("EventQueue dispatcher", dispatch_loop)):
+        start = time.perf_counter()
+        loop(days)
+        elapsed = time.perf_counter() - start
+        print("%-22s %12.0f events/s" % (name, days * EVENTS_PER_DAY / elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -1,3 +1,5 @@
+import logging
+
 from kaleidoscope import brokers, sizers, datafeeds
 from kaleidoscope.backtest import Backtest
 from kaleidoscope.strategy import Strategy
@@ -5,3 +7,6 @@ from kaleidoscope.options.option_strategies import OptionStrategies
 from kaleidoscope.options.option_query import OptionQuery
 
 from .globals import Period, OptionType, OrderAction, OrderType, OrderTIF
+
+# orders and fills are logged, applications configure the handlers that output them
+logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -22,6 +22,9 @@ class Account(object):
         """
         self.cash = amt
 
+        # the broker only revalues the account on quote dates with positions or working orders
+        self.net_liquidating_value = self.calc_net_liquidating_value()
+
     def process_order(self, order):
         """
         Append the new options positions to the account.
@@ -47,7 +50,7 @@ class Account(object):
     def update(self, quotes):
         """
         Update the account's position's values with latest quotes
-        :param quotes: DataFrame containing option chains
+        :param quotes: DataFrame containing option chains, or dict of option chains by underlying symbol
         :return: None
         """
 
@@ -1,34 +1,53 @@
-import collections
+import collections.abc
 import itertools
-import queue
+import logging
 import time
 
 from kaleidoscope.account import Account
 from kaleidoscope.brokers.default_broker import DefaultBroker
 from kaleidoscope.commissions import default_commissions
+from kaleidoscope.datafeeds.base import BaseDataFeed
 from kaleidoscope.datafeeds.sqlite_data import SQLiteDataFeed
+from kaleidoscope.dispatcher import Dispatcher, EventQueue
 from kaleidoscope.event import EventType
+from kaleidoscope.helpers import set_verbosity
 from kaleidoscope.margin import tos_margin
 
+logger = logging.getLogger(__name__)
+
 
 class Backtest(object):
     def __init__(self, broker=DefaultBroker,
                  commissions=default_commissions,
                  margin=tos_margin,
                  data=SQLiteDataFeed,
-                 data_path=None
+                 data_path=None,
+                 streaming=False,
+                 max_workers=None,
+                 out_of_core=False,
+                 evict=False,
+                 prefetch=0,
+                 verbosity=None
                  ):
 
+        # orders and fills are logged at INFO level, e.g. logging.WARNING keeps runs quiet,
+        # None leaves the logging configuration of the application as it is
+        if verbosity is not None:
+            set_verbosity(verbosity)
+
         # setup backtest private variables
         self.data = None
         self.strats = list()
-        self.queue = queue.Queue()
+        self.queue = EventQueue()
 
         # initialize backtest configuration
-        self.datafeed = data(data_path)
+        # data can be a data feed class or an already configured data feed, e.g. a CachedDataFeed
+        self.datafeed = data if isinstance(data, BaseDataFeed) else data(data_path)
         self.commissions = commissions
         self.margin = margin
-        self.broker = broker(self.datafeed, self.commissions, self.margin, self.queue)
+        self.broker = broker(self.datafeed, self.commissions, self.margin, self.queue,
+                             streaming=streaming, max_workers=max_workers, out_of_core=out_of_core,
+                             evict=evict, prefetch=prefetch)
 
     def add_strategy(self, strategy, **kwargs):
         """
@@ -84,7 +103,7 @@ class Backtest(object):
         for elem in iterable:
             if isinstance(elem, str):
                 elem = (elem,)
-            elif not isinstance(elem, collections.Iterable):
+            elif not isinstance(elem, collections.abc.Iterable):
                 elem = (elem,)
 
             niterable.append(elem)
@@ -105,27 +124,22 @@ class Backtest(object):
                                    )
             self.broker.continue_backtest = True
 
+            dispatcher = Dispatcher(self.queue)
+            # update strategy instance with current data
+            dispatcher.register(EventType.DATA, strategy.on_data_event)
+            # send the order to the broker for processing
+            dispatcher.register(EventType.ORDER, self.broker.process_order)
+            # notify the strategy that we have a fill on one of its orders
+            dispatcher.register(EventType.FILL, strategy.on_fill_event)
+            dispatcher.register(EventType.REJECTED, strategy.on_rejected_event)
+
             while self.broker.continue_backtest:
-                # run backtesting loop
-                try:
-                    event = self.queue.get(False)
-                except queue.Empty:
-                    self.broker.stream_next()
-                else:
-                    if event is not None:
-                        if event.event_type == EventType.DATA:
-                            # update strategy instance with current data
-                            strategy.on_data_event(event)
-                        elif event.event_type == EventType.ORDER:
-                            # send the order to the broker for processing
-                            self.broker.process_order(event)
-                        elif event.event_type == EventType.FILL:
-                            # notify the strategy that we have a fill on one of its orders
-                            strategy.on_fill_event(event)
-                        elif event.event_type == EventType.REJECTED:
-                            strategy.on_rejected_event(event)
-                        else:
-                            raise NotImplementedError("Unsupported event.type '%s'" % event.type)
+                # handle the day's data event and the orders and fills it leads to,
+                # before the broker streams the next day
+                dispatcher.dispatch()
+                self.broker.stream_next()
+
+        self.datafeed.close()
 
         program_ends = time.time()
-        print("The simulation ran for {0} seconds.".format(round(program_ends - program_starts, 2)))
+        logger.info("The simulation ran for %s seconds.", round(program_ends - program_starts, 2))
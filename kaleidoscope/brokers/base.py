@@ -1,20 +1,52 @@
-import pandas as pd
+import collections
+import concurrent.futures
 
-from kaleidoscope.options.iterator.option_chain import OptionChainIterator
+from kaleidoscope.options.chain_store import ChainStore
+from kaleidoscope.options.iterator.option_chain import OptionChainIterator, PrefetchIterator, merge_days
 
 
 class BaseBroker(object):
-    def __init__(self, datafeed, commissions, margin, queue):
+    def __init__(self, datafeed, commissions, margin, queue, streaming=False, max_workers=None,
+                 out_of_core=False, evict=False, prefetch=0):
 
         self.datafeed = datafeed
         self.account = None
         self.commissions = commissions
         self.margin = margin
 
-        # raw options chain data dict
+        # option chain stores of the loaded symbols, and the subscription params they were loaded with
         self.data = {}
+        self.loaded = {}
         self.data_stream = None
 
+        # subscribed symbols and their datafeed params, sourced when the backtest starts
+        self.subscriptions = collections.OrderedDict()
+
+        # in streaming mode, option chains are read from the data source one quote date
+        # at a time instead of being loaded into the data dict
+        self.streaming = streaming
+
+        # in out of core mode, option chains are loaded one partition of the data source
+        # at a time, e.g. one month, while the next partition is loaded in the background
+        self.out_of_core = out_of_core
+
+        if streaming and out_of_core:
+            raise ValueError("Streaming and out of core modes cannot be used together")
+
+        # drop the option chains of past quote dates and expired contracts, and finished orders,
+        # as the backtest advances, loaded symbols are reloaded for the next backtest
+        self.evict = evict
+
+        # number of quote dates whose data events are prepared ahead in a background thread
+        # while the current one is processed, 0 prepares each quote date when it is reached
+        self.prefetch = prefetch
+
+        if prefetch < 0:
+            raise ValueError("Prefetch must be 0 or more quote dates")
+
+        # max threads used to load subscribed symbols concurrently, None uses the executor's default
+        self.max_workers = max_workers
+
         # events queue to send order events to
         self.queue = queue
 
@@ -28,34 +60,159 @@ class BaseBroker(object):
         self.account.set_cash(balance)
 
     def source(self, symbol, start=None, end=None,
-               exclude_splits=True, option_type=None
+               exclude_splits=True, option_type=None, requirements=None
                ):
         """
-        Get the option chain data from data source and store in data dict
+        Subscribe to the option chain data of a symbol. Subscriptions are collected and
+        loaded together from the data source before the first quote date is streamed.
 
         :param symbol: symbol to construct datafeed for
         :param start: start date to get options data for
         :param end: end date to get options data for
         :param exclude_splits: exclude options created as result of stock split, default True
         :param option_type: source a specific option type
+        :param requirements: Requirements of the option contracts to source, None sources all contracts
         :return:
         """
+        params = {'start': start, 'end': end, 'exclude_splits': exclude_splits, 'option_type': option_type}
+
+        if requirements is not None:
+            params['requirements'] = requirements
+
+        self.subscriptions[symbol] = params
+
+        # the data stream is rebuilt with the new symbol on the next stream_next call
+        self._close_stream()
+
+    def _load(self):
+        """
+        Get the option chain data of subscribed symbols that are not loaded yet, or were
+        loaded with other subscription params, from the data source and store it in the
+        data dict as chain stores, which keep each option contract's attributes once
+        instead of on every daily quote.
 
-        if symbol not in self.data:
-            try:
-                # we don't have raw option prices for this symbol yet, get it from data source
-                self.data[symbol] = self.datafeed.get(symbol, start, end, exclude_splits, option_type)
-            except IOError:
-                raise
+        Data feeds that read several symbols in one pass get the symbols sharing their
+        subscription params with one get_many call, other data feeds get each symbol with
+        its own get call. The calls run concurrently.
+        """
+        pending = [symbol for symbol, params in self.subscriptions.items()
+                   if symbol not in self.data or self.loaded[symbol] != params]
+
+        if not pending:
+            return
+
+        batches = collections.OrderedDict()
+
+        for symbol in pending:
+            params = self.subscriptions[symbol]
+            key = tuple(sorted(params.items())) if self.datafeed.batch_symbols else symbol
+            batches.setdefault(key, []).append(symbol)
+
+        def get(symbols):
+            params = self.subscriptions[symbols[0]]
+
+            if len(symbols) == 1:
+                chains = {symbols[0]: self.datafeed.get(symbols[0], **params)}
+            else:
+                chains = self.datafeed.get_many(symbols, **params)
 
-        # now that we added a new symbol, merge it into the data stream
-        self.data_stream = self._merge_sources()
+            return {symbol: ChainStore(chains[symbol]) for symbol in symbols}
+
+        # the stores are replaced, e.g. when a scenario of an optimization subscribes with other requirements
+        self.loaded.update((symbol, self.subscriptions[symbol]) for symbol in pending)
+
+        if len(batches) == 1:
+            stores = get(next(iter(batches.values())))
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(get, symbols) for symbols in batches.values()]
+
+                # raises the IOError of a failed symbol
+                stores = dict()
+                for future in futures:
+                    stores.update(future.result())
+
+        # stores are kept in subscription order
+        for symbol in pending:
+            self.data[symbol] = stores[symbol]
+
+    def _partitions(self, symbol):
+        """
+        Load the option chains of a symbol one partition of the data source at a time.
+        The next partition is loaded in a background thread while the days of the current
+        one are iterated, and a partition is released once its last day is reached.
+        Positions keep the last quote of their contracts, so they hold no reference
+        to past partitions.
+
+        :param symbol: subscribed symbol to load
+        :return: generator of (quote_date, dataframe) tuples ordered by quote date
+        """
+        params = self.subscriptions[symbol]
+        partitions = self.datafeed.partitions(symbol, params['start'], params['end'])
+
+        def get(partition):
+            return ChainStore(self.datafeed.get(symbol, **dict(params, start=partition[0], end=partition[1])))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(get, partitions[0]) if partitions else None
+
+            for i in range(len(partitions)):
+                store = pending.result()
+                pending = executor.submit(get, partitions[i + 1]) if i + 1 < len(partitions) else None
+
+                for day in store.days(evict=self.evict, lazy=True):
+                    yield day
+
+                # release the partition before waiting for the next one
+                del store
 
     def _merge_sources(self):
 
-        df = pd.concat(self.data, ignore_index=True)
-        # create an iterator to iterate over all data by quote_data
-        return OptionChainIterator(df)
+        if self.streaming:
+            # streams cannot be rewound, open new ones for every backtest
+            streams = {symbol: self.datafeed.stream(symbol, **params) for symbol, params in self.subscriptions.items()}
+        elif self.out_of_core:
+            streams = {symbol: self._partitions(symbol) for symbol in self.subscriptions}
+        else:
+            self._load()
+            # each symbol's contracts and quotes are joined when the option chains of a quote date are used
+            streams = {symbol: self.data[symbol].days(evict=self.evict, lazy=True) for symbol in self.data}
+
+            if self.evict:
+                # the streams own the stores they empty
+                self.data = {}
+
+        # create an iterator to iterate over the daily option chains of all symbols by quote_date,
+        # the option chains of each day are kept apart by symbol
+        data_stream = OptionChainIterator(merge_days(streams))
+
+        if not self.prefetch:
+            return data_stream
+
+        return PrefetchIterator(self._prepare_events(data_stream), self.prefetch)
+
+    @staticmethod
+    def _prepare_events(data_stream):
+        """
+        Join the option chains of each data event with their contracts and build its
+        OptionQuery, so a prefetched stream does this work in its background thread.
+
+        :param data_stream: iterator of data events
+        :return: generator of the prepared data events
+        """
+        for data_event in data_stream:
+            # joins the option chains kept apart by symbol
+            data_event.quotes
+            yield data_event
+
+    def _close_stream(self):
+        """
+        Discard the data stream, stopping the background thread of a prefetched stream.
+        """
+        if isinstance(self.data_stream, PrefetchIterator):
+            self.data_stream.close()
+
+        self.data_stream = None
 
     def stream_next(self):
         """
@@ -63,19 +220,32 @@ class BaseBroker(object):
 
         :return: A bar event object containing the bar data for all subscribed symbols
         """
+        if self.data_stream is None:
+            self.data_stream = self._merge_sources()
+
         try:
             data_event = next(self.data_stream)
         except StopIteration:
             self.continue_backtest = False
             return
 
-        # update the current state for the broker and it's orders
+        # update the current state for the broker and it's orders, a broker without
+        # positions or working orders has nothing to update
         self.current_date = data_event.date
-        self.update_data(data_event.quotes)
+
+        if self.active():
+            # orders and positions are updated from the option chains of their underlying symbol
+            self.update_data(data_event.chains)
 
         # Send event to queue
         self.queue.put(data_event)
 
+    def active(self):
+        """
+        Check if the broker holds positions or working orders to update with new quotes.
+        """
+        return True
+
     def update_data(self, event):
         raise NotImplementedError("Subclass update_data method!")
 
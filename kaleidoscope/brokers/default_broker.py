@@ -7,12 +7,14 @@ from .base import BaseBroker
 
 
 class DefaultBroker(BaseBroker):
-    def __init__(self, datafeed, commissions, margin, queue):
+    def __init__(self, datafeed, commissions, margin, queue, streaming=False, max_workers=None,
+                 out_of_core=False, evict=False, prefetch=0):
 
         self.order_list = collections.OrderedDict()
         self.quotes = None
 
-        super().__init__(datafeed, commissions, margin, queue)
+        super().__init__(datafeed, commissions, margin, queue, streaming, max_workers, out_of_core, evict,
+                         prefetch)
 
     def positions_total(self):
         return len(self.account.positions)
@@ -20,6 +22,10 @@ class DefaultBroker(BaseBroker):
     def working_total(self):
         return sum(1 for order in self.order_list if self.order_list[order].status == OrderStatus.WORKING)
 
+    def active(self):
+        return bool(self.account.positions) or any(order.status == OrderStatus.WORKING
+                                                   for order in self.order_list.values())
+
     def _execute(self, order):
         """
         Execute the order, set status and create fill event.
@@ -91,17 +97,23 @@ class DefaultBroker(BaseBroker):
         Using fresh quotes from data source, update current values
         for pending orders and positions held in accounts.
 
-        :param quotes: fresh quotes in DataFrame format
+        :param quotes: fresh quotes in DataFrame format, or dict of DataFrames by underlying symbol
         """
-        self.quotes = quotes.fetch()
+        self.quotes = quotes
 
         # update the broker's working orders' option prices
         for order_item in self.order_list:
             order = self.order_list[order_item]
-            if order.status == OrderStatus.WORKING:
-                order.update(self.quotes)
+            # orders with a leg without a quote today stay working until all legs are quoted
+            if order.status == OrderStatus.WORKING and order.update(self.quotes):
                 self.execute_order(order)
 
+        if self.evict:
+            # filled orders are kept by the account's positions
+            for ticket in [ticket for ticket in self.order_list
+                           if self.order_list[ticket].status != OrderStatus.WORKING]:
+                del self.order_list[ticket]
+
         # update the account's position values
         self.account.update(self.quotes)
 
@@ -1 +1,6 @@
 from .sqlite_data import SQLiteDataFeed
+from .parquet_data import ParquetDataFeed
+from .numpy_data import NumpyDataFeed
+from .cache import CachedDataFeed
+from .csv_data import CSVDataFeed
+from .requirements import Requirements
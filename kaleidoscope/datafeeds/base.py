@@ -1,3 +1,10 @@
+import threading
+
+import pandas as pd
+
+from kaleidoscope.helpers import derive_columns
+
+
 class BaseDataFeed(object):
     """
     Map columns from data source to the standard option columns used in the library.
@@ -6,12 +13,61 @@ class BaseDataFeed(object):
                               -1 means do not map this column
     """
 
+    # get_many reads the option chains of several symbols in one pass, instead of one get per symbol
+    batch_symbols = False
+
+    # issues counted by the quality report of cleaned option chains
+    QUALITY_COLUMNS = ('underlying_symbol', 'quote_date', 'rows', 'duplicates', 'crossed',
+                       'zero_bid', 'negative_mark', 'dropped')
+
+    # columns converted by compact mode
+    CATEGORY_COLUMNS = ('symbol', 'underlying_symbol', 'root', 'option_type')
+    FLOAT32_COLUMNS = ('open', 'high', 'low', 'close', 'bid', 'ask', 'underlying_price',
+                       'iv', 'delta', 'gamma', 'theta', 'vega', 'rho', 'mark', 'spread', 'moneyness')
+    INT32_COLUMNS = ('trade_volume', 'bid_size', 'ask_size', 'open_interest', 't_delta')
+    DATE_COLUMNS = ('quote_date', 'expiration')
+
+    # defaults of data feeds that do not call BaseDataFeed.__init__
+    compact = False
+    clean = False
+    bytes_saved = 0
+
+    # quality reports of the option chains cleaned so far, created by the first report
+    _reports = None
+
+    # guards the reports and counters updated by symbols loaded in concurrent threads
+    _stats_lock = threading.Lock()
+
+    def __init__(self, compact=False, clean=False):
+        """
+        :param compact: convert option chains to compact dtypes, see _compact
+        :param clean: drop bad quotes from option chains, see _clean
+        """
+        self.compact = compact
+        self.clean = clean
+
+    @staticmethod
+    def _mapped_columns(opt_params):
+        """
+        Return the (column name, source column index) pairs of opt_params that
+        are mapped to a column of the data source.
+
+        :param opt_params: the column mapping of the data source
+        :return: list of tuples for the mapped columns, in opt_params order
+        """
+        return [col for col in opt_params if col[1] != -1]
+
     def _normalize(self, dataframe, opt_params):
         """
         Normalize column names using opt_params defined in this class. Normalization
         means to map columns from data source that may have different names for the same
         columns to a standard column name that will be used in this program.
 
+        The derived columns (t_delta, mark, spread and moneyness) are added once here,
+        so option queries and strategies can use them as plain columns. If cleaning is
+        on, bad quotes are dropped first, and if compact mode is on, the columns are
+        also converted to compact dtypes.
+
         :param dataframe: the pandas dataframe containing data from the data source
         :return: dataframe with the columns renamed with standard column names and unnecessary
                  (mapped with -1) columns dropped
@@ -19,17 +75,249 @@ class BaseDataFeed(object):
         columns = list()
         col_names = list()
 
-        for col in opt_params:
-            if col[1] != -1:
-                columns.append(col[1])
-                col_names.append(col[0])
+        for col in self._mapped_columns(opt_params):
+            columns.append(col[1])
+            col_names.append(col[0])
+
+        # data sources that select the mapped columns by name are already normalized
+        if list(dataframe.columns) != col_names:
+            dataframe = dataframe.iloc[:, columns]
+            dataframe.columns = col_names
+
+        return self._prepare(dataframe)
+
+    def _prepare(self, dataframe):
+        """
+        Clean normalized option chains if cleaning is on, add the derived columns and
+        convert them to compact dtypes if compact mode is on.
+
+        :param dataframe: dataframe with normalized option chains
+        :return: dataframe ready to be used by the library
+        """
+        if self.clean:
+            dataframe = self._clean(dataframe)
+
+        dataframe = derive_columns(dataframe)
+
+        if self.compact:
+            dataframe = self._compact(dataframe)
+
+        return dataframe
+
+    def _compact(self, dataframe):
+        """
+        Convert normalized option chains to compact dtypes: categoricals for the string
+        columns, float32 for prices and greeks, int32 for volumes and datetime64 for dates.
+        Strikes stay float64 since they are used as merge keys when building spreads.
+
+        :param dataframe: dataframe with normalized option chains
+        :return: dataframe with compact dtypes
+        """
+        before = dataframe.memory_usage(index=False, deep=True).sum()
+        dataframe = dataframe.copy()
+
+        for col in dataframe.columns:
+            values = dataframe[col]
+
+            if col in self.CATEGORY_COLUMNS:
+                dataframe[col] = values.astype('category')
+            elif col in self.FLOAT32_COLUMNS:
+                dataframe[col] = values.astype('float32')
+            elif col in self.INT32_COLUMNS and not values.isnull().any():
+                dataframe[col] = values.astype('int32')
+            elif col in self.DATE_COLUMNS:
+                dataframe[col] = pd.to_datetime(values)
+
+        saved = int(before - dataframe.memory_usage(index=False, deep=True).sum())
+
+        with self._stats_lock:
+            self.bytes_saved += saved
+
+        return dataframe
+
+    def _clean(self, dataframe):
+        """
+        Drop bad quotes of normalized option chains in one vectorized pass: repeated rows
+        of a contract on a quote date (the first one is kept), crossed markets with the
+        bid above the ask, zero bids and negative marks. These rows would otherwise be
+        combined into spreads by the option strategies.
+
+        The counts of each issue by symbol and quote date are collected for quality_report
+        and attached to the result as a list of records in attrs['quality'], which pandas
+        can compare when the result is concatenated.
+
+        :param dataframe: dataframe with normalized option chains
+        :return: dataframe without the bad quotes
+        """
+        duplicates = dataframe.duplicated(['symbol', 'quote_date'])
+        crossed = dataframe['bid'] > dataframe['ask']
+        zero_bid = dataframe['bid'] == 0
+        negative_mark = dataframe['bid'] + dataframe['ask'] < 0
+        dropped = duplicates | crossed | zero_bid | negative_mark
+
+        issues = pd.DataFrame({'underlying_symbol': dataframe['underlying_symbol'],
+                               'quote_date': dataframe['quote_date'], 'rows': 1,
+                               'duplicates': duplicates, 'crossed': crossed, 'zero_bid': zero_bid,
+                               'negative_mark': negative_mark, 'dropped': dropped})
+
+        report = issues.groupby(['underlying_symbol', 'quote_date'], sort=True, observed=True).sum().reset_index()
+        report['quote_date'] = pd.to_datetime(report['quote_date'])
+        report = report.astype({col: 'int64' for col in self.QUALITY_COLUMNS[2:]})
+
+        if dropped.any():
+            dataframe = dataframe[~dropped].reset_index(drop=True)
 
-        dataframe = dataframe.iloc[:, columns]
-        dataframe.columns = col_names
+        dataframe.attrs['quality'] = report.to_dict('records')
+        self._record(report)
 
         return dataframe
 
+    @classmethod
+    def _quality(cls, dataframe):
+        """
+        Return the quality report attached to cleaned option chains, or None.
+        """
+        if 'quality' not in dataframe.attrs:
+            return None
+
+        return pd.DataFrame(dataframe.attrs['quality'], columns=cls.QUALITY_COLUMNS)
+
+    def _record(self, report):
+        with self._stats_lock:
+            if self._reports is None:
+                self._reports = list()
+
+            self._reports.append(report)
+
+    def quality_report(self):
+        """
+        Return the quality report of the option chains cleaned by this data feed so far.
+
+        :return: dataframe with the counts of each issue by symbol and quote date
+        """
+        with self._stats_lock:
+            reports = list(self._reports or ())
+
+        if not reports:
+            return pd.DataFrame(columns=self.QUALITY_COLUMNS)
+
+        report = pd.concat(reports, ignore_index=True)
+        report = report.drop_duplicates(['underlying_symbol', 'quote_date'], keep='last')
+
+        return report.sort_values(['underlying_symbol', 'quote_date']).reset_index(drop=True)
+
+    @staticmethod
+    def _days(chunks):
+        """
+        Group chunks of option chains into daily option chains. The chunks must be
+        ordered by quote date, a quote date may span more than one chunk.
+
+        :param chunks: iterable of dataframes ordered by quote_date
+        :return: generator of (quote_date, dataframe) tuples, one for each quote date
+        """
+        pending = None
+
+        for chunk in chunks:
+            if pending is not None:
+                chunk = pd.concat([pending, chunk], ignore_index=True)
+
+            if chunk.empty:
+                continue
+
+            # the last quote date of the chunk may continue in the next chunk, hold it back
+            last_day = chunk['quote_date'] == chunk['quote_date'].iloc[-1]
+            pending = chunk[last_day]
+
+            for quote_date, option_chains in chunk[~last_day].groupby('quote_date', sort=True):
+                yield quote_date, option_chains
+
+        if pending is not None and not pending.empty:
+            yield pending['quote_date'].iloc[0], pending
+
+    @staticmethod
+    def _month_ranges(months, start=None, end=None):
+        """
+        Return the date ranges of months, the first and last range are clipped to start and end.
+
+        :param months: months as 'YYYY-MM' strings, in order
+        :param start: start date as 'YYYY-MM-DD', None is unbounded
+        :param end: end date as 'YYYY-MM-DD', None is unbounded
+        :return: list of (start, end) date tuples of the months between start and end
+        """
+        ranges = list()
+
+        for month in months:
+            first = month + "-01"
+            last = (pd.Timestamp(first) + pd.offsets.MonthEnd(0)).strftime("%Y-%m-%d")
+
+            if (start is not None and last < start) or (end is not None and first > end):
+                continue
+
+            ranges.append((first if start is None else max(first, start),
+                           last if end is None else min(last, end)))
+
+        return ranges
+
     def get(self, symbol, start, end,
-            exclude_splits=False, option_type=None
+            exclude_splits=False, option_type=None, requirements=None
             ):
         raise NotImplementedError("Subclass get method!")
+
+    def partitions(self, symbol, start=None, end=None):
+        """
+        Return the date ranges in which the option chains of a symbol can be read one
+        after the other, e.g. the months of a data source partitioned by month. Data feeds
+        that can read part of their data source efficiently should override this method,
+        by default the whole date range is a single partition.
+
+        :param symbol: symbol to get the partitions of
+        :param start: start date of the date range
+        :param end: end date of the date range
+        :return: list of (start, end) date tuples
+        """
+        return [(start, end)]
+
+    def get_many(self, symbols, start=None, end=None,
+                 exclude_splits=True, option_type=None, requirements=None
+                 ):
+        """
+        Get the option chains of several symbols. Data feeds that can read several
+        symbols in one pass should override this method.
+
+        :param symbols: symbols to get option data for
+        :param start: start date to retrieve data from
+        :param end: end date to retrieve data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will retrieve both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to retrieve, None retrieves all contracts
+        :return: dict of dataframes containing option chains by symbol
+        """
+        # only pass requirements when given, for data feeds written before requirements existed
+        kwargs = {} if requirements is None else {'requirements': requirements}
+        return {symbol: self.get(symbol, start, end, exclude_splits, option_type, **kwargs) for symbol in symbols}
+
+    def close(self):
+        """
+        Release resources held by the data feed, e.g. open connections.
+        """
+        pass
+
+    def stream(self, symbol, start=None, end=None,
+               exclude_splits=True, option_type=None, requirements=None
+               ):
+        """
+        Stream the option chains of a symbol one quote date at a time. Data feeds
+        that can read their source incrementally should override this method, by
+        default the option chains are loaded with get and split by quote date.
+
+        :param symbol: symbol to stream option data for
+        :param start: start date to stream data from
+        :param end: end date to stream data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will stream both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to stream, None streams all contracts
+        :return: generator of (quote_date, dataframe) tuples ordered by quote date
+        """
+        kwargs = {} if requirements is None else {'requirements': requirements}
+        data = self.get(symbol, start, end, exclude_splits, option_type, **kwargs)
+        return self._days([data.sort_values('quote_date', kind='mergesort')])
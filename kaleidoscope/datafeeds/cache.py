@@ -0,0 +1,289 @@
+from .base import BaseDataFeed
+import kaleidoscope.globals as gb
+from kaleidoscope.helpers import DERIVED_COLUMNS
+import hashlib
+import json
+import os
+import pandas as pd
+
+CACHE_SUB_DIR = "cache"
+
+
+class CachedDataFeed(BaseDataFeed):
+    def __init__(self, datafeed, path=None, validate='mtime'):
+        """
+        Persistent cache of the option chains returned by another data feed. Option chains
+        are cached by symbol and filters together with the date range they cover, a request
+        for a date range within a cached range is served by slicing the cached option chains.
+
+        Cached option chains are dropped when the data source of the data feed changes,
+        unless the change was announced with invalidate, which only drops the cached
+        option chains covering the changed quote dates.
+
+        Option chains of a data feed that cleans bad quotes are cached cleaned, together
+        with their quality report, so the cleaning is only done once.
+
+        :param datafeed: the data feed to cache option chains for
+        :param path: directory to store cached option chains in
+        :param validate: how to detect changes of the data source, 'mtime' compares the
+                         modification time and size of the source files, 'hash' compares
+                         the sha1 hash of their content
+        """
+        if validate not in ('mtime', 'hash'):
+            raise ValueError("validate must be 'mtime' or 'hash'")
+
+        super().__init__()
+        self.datafeed = datafeed
+        self.path = path
+        self.validate = validate
+
+        # hash signature of the source files and the mtime signature it was computed for
+        self._hashed = (None, None)
+
+        if self.path is None:
+            # use default path if no path given
+            self.path = os.path.join(os.sep, gb.PROJECT_DIR, gb.DATA_SUB_DIR, CACHE_SUB_DIR)
+
+    def _source_files(self):
+        """
+        Return the files of the wrapped data feed's data source.
+        """
+        source = getattr(self.datafeed, 'path', None)
+
+        if source is None or not os.path.exists(source):
+            return []
+        elif os.path.isfile(source):
+            return [source]
+
+        return sorted(os.path.join(root, name) for root, _, names in os.walk(source) for name in names)
+
+    def signature(self):
+        """
+        Return a signature of the data source that changes when the data source is modified.
+        In hash mode the source files are only hashed again once their modification time
+        or size changes, so cache hits do not read the whole data source.
+
+        :return: signature string
+        """
+        sources = self._source_files()
+        signature = hashlib.sha1()
+
+        for source in sources:
+            stat = os.stat(source)
+            signature.update(("%s:%s:%s;" % (source, stat.st_mtime_ns, stat.st_size)).encode())
+
+        if self.validate != 'hash':
+            return signature.hexdigest()
+
+        if self._hashed[0] != signature.hexdigest():
+            content = hashlib.sha1()
+
+            for source in sources:
+                with open(source, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        content.update(block)
+
+            self._hashed = (signature.hexdigest(), content.hexdigest())
+
+        return self._hashed[1]
+
+    def _key(self, symbol, exclude_splits, option_type, requirements):
+        """
+        Return the cache key for a symbol and its filters. Cached option chains include
+        the derived columns, so the key changes with them.
+        """
+        key = repr((type(self.datafeed).__name__, getattr(self.datafeed, 'path', None),
+                    getattr(self.datafeed, 'opt_params', None), self.datafeed.compact, self.datafeed.clean,
+                    DERIVED_COLUMNS,
+                    symbol, exclude_splits, option_type, requirements))
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _manifest(self, key, signature):
+        """
+        Return the cached date ranges of a cache key, entries cached for an older
+        version of the data source are removed.
+
+        :param key: cache key
+        :param signature: signature of the current data source
+        :return: list of cached entries
+        """
+        path = os.path.join(self.path, key + ".json")
+
+        if not os.path.exists(path):
+            return []
+
+        with open(path) as f:
+            manifest = json.load(f)
+
+        if manifest['signature'] != signature:
+            for entry in manifest['entries']:
+                self._remove(entry)
+            os.remove(path)
+            return []
+
+        return manifest['entries']
+
+    def _save_manifest(self, key, signature, entries, symbol):
+        with open(os.path.join(self.path, key + ".json"), 'w') as f:
+            json.dump({'signature': signature, 'entries': entries, 'symbol': symbol,
+                       'source': getattr(self.datafeed, 'path', None)}, f)
+
+    def _remove(self, entry):
+        path = os.path.join(self.path, entry['file'])
+        if os.path.exists(path):
+            os.remove(path)
+
+    @staticmethod
+    def _covers(entry, start, end):
+        """
+        Check if the date range of a cache entry contains the requested date range,
+        a date of None is unbounded.
+        """
+        covers_start = entry['start'] is None or (start is not None and entry['start'] <= start)
+        covers_end = entry['end'] is None or (end is not None and entry['end'] >= end)
+        return covers_start and covers_end
+
+    @staticmethod
+    def _overlaps(entry, start, end):
+        """
+        Check if the date range of a cache entry overlaps the date range between start and end.
+        """
+        before = entry['end'] is not None and start is not None and entry['end'] < start
+        after = entry['start'] is not None and end is not None and entry['start'] > end
+        return not (before or after)
+
+    @staticmethod
+    def _slice(data, start, end):
+        """
+        Return the option chains of data with quote dates between start and end.
+        """
+        report = CachedDataFeed._quality(data)
+
+        if report is not None:
+            data.attrs['quality'] = CachedDataFeed._slice(report, start, end).to_dict('records')
+
+        quote_dates = data['quote_date']
+
+        if str(quote_dates.dtype).startswith('datetime'):
+            start = None if start is None else pd.Timestamp(start)
+            end = None if end is None else pd.Timestamp(end)
+
+        mask = pd.Series(True, index=data.index)
+
+        if start is not None:
+            mask &= quote_dates >= start
+
+        if end is not None:
+            mask &= quote_dates <= end
+
+        return data if mask.all() else data[mask].reset_index(drop=True)
+
+    def close(self):
+        self.datafeed.close()
+
+    def partitions(self, symbol, start=None, end=None):
+        return self.datafeed.partitions(symbol, start, end)
+
+    def invalidate(self, symbol, start=None, end=None, previous=None):
+        """
+        Drop the cached option chains of a symbol covering quote dates between start and
+        end, e.g. after new quote dates were appended to the data source. The other cached
+        option chains of the data source are kept valid for its current version.
+
+        :param symbol: symbol whose option chains changed
+        :param start: first changed quote date
+        :param end: last changed quote date
+        :param previous: signature of the data source before the change, if given only
+                         cached option chains of that version are kept valid
+        :return: None
+        """
+        if not os.path.isdir(self.path):
+            return
+
+        signature = self.signature()
+        source = getattr(self.datafeed, 'path', None)
+
+        for name in os.listdir(self.path):
+            if not name.endswith(".json"):
+                continue
+
+            with open(os.path.join(self.path, name)) as f:
+                manifest = json.load(f)
+
+            # manifests of other data sources, or written before the source was recorded, are left alone
+            if 'source' not in manifest or manifest['source'] != source:
+                continue
+
+            # cached option chains of an older version are dropped on their next get
+            if previous is not None and manifest['signature'] != previous:
+                continue
+
+            entries = manifest['entries']
+
+            if manifest['symbol'] == symbol:
+                for entry in [entry for entry in entries if self._overlaps(entry, start, end)]:
+                    self._remove(entry)
+                    entries.remove(entry)
+
+            self._save_manifest(name[:-len(".json")], signature, entries, manifest['symbol'])
+
+    def clear(self):
+        """
+        Remove all cached option chains.
+        """
+        if os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                if name.endswith(".json") or name.endswith(".pkl"):
+                    os.remove(os.path.join(self.path, name))
+
+    def get(self, symbol, start=None, end=None,
+            exclude_splits=True, option_type=None, requirements=None):
+        """
+        Get the option chains of a symbol from the cache, or from the wrapped data feed
+        if no cached date range contains the requested date range.
+
+        :param symbol: symbol to get option data for
+        :param start: start date to retrieve data from
+        :param end: end date to retrieve data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will retrieve both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to retrieve, None retrieves all contracts
+        :return: dataframe containing option chains
+        """
+        os.makedirs(self.path, exist_ok=True)
+
+        key = self._key(symbol, exclude_splits, option_type, requirements)
+        signature = self.signature()
+        entries = self._manifest(key, signature)
+
+        for entry in entries:
+            if self._covers(entry, start, end):
+                data = pd.read_pickle(os.path.join(self.path, entry['file']))
+                data = self._slice(data, start, end)
+
+                # the quality report of cleaned option chains is cached with them
+                if 'quality' in data.attrs:
+                    self._record(self._quality(data))
+
+                return data
+
+        kwargs = {} if requirements is None else {'requirements': requirements}
+        data = self.datafeed.get(symbol, start, end, exclude_splits, option_type, **kwargs)
+
+        entry = {'start': start, 'end': end,
+                 'file': "%s_%s.pkl" % (key, hashlib.sha1(repr((start, end)).encode()).hexdigest()[:12])}
+
+        # the new date range replaces the cached date ranges it contains
+        for cached in [cached for cached in entries if self._covers(entry, cached['start'], cached['end'])]:
+            self._remove(cached)
+            entries.remove(cached)
+
+        data.to_pickle(os.path.join(self.path, entry['file']))
+
+        if 'quality' in data.attrs:
+            self._record(self._quality(data))
+
+        entries.append(entry)
+        self._save_manifest(key, signature, entries, symbol)
+
+        return data
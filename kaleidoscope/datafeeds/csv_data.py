@@ -0,0 +1,221 @@
+from .base import BaseDataFeed
+import kaleidoscope.globals as gb
+import glob
+import os
+import re
+import pandas as pd
+
+
+class CSVDataFeed(BaseDataFeed):
+    def __init__(self, path=None, chunksize=100000, compact=False, clean=False):
+        """
+        Data feed for option chains stored in a directory of csv files, e.g. daily files
+        from a data vendor. Files are read in file name order, so their names must sort
+        by quote date. Dates in file names (YYYY-MM-DD or YYYYMMDD) are used to skip
+        files outside of the requested date range.
+
+        :param path: path of the csv directory, or of a single csv file
+        :param chunksize: rows to parse at a time
+        :param compact: convert option chains to compact dtypes
+        :param clean: drop bad quotes from option chains, see BaseDataFeed._clean
+        """
+        super().__init__(compact, clean)
+        self.path = path
+        self.chunksize = chunksize
+
+        self.opt_params = (
+            ('symbol', 0),
+            ('underlying_symbol', 1),
+            ('quote_date', 2),
+            ('root', 3),
+            ('expiration', 4),
+            ('strike', 5),
+            ('option_type', 6),
+            ('open', -1),
+            ('high', -1),
+            ('low', -1),
+            ('close', -1),
+            ('trade_volume', 11),
+            ('bid_size', -1),
+            ('bid', 13),
+            ('ask_size', -1),
+            ('ask', 15),
+            ('underlying_price', 16),
+            ('iv', -1),
+            ('delta', 18),
+            ('gamma', 19),
+            ('theta', 20),
+            ('vega', 21),
+            ('rho', 22),
+            ('open_interest', -1)
+        )
+
+        # dtypes of the mapped columns, so the parser does not have to infer them
+        self.dtypes = {
+            'symbol': str,
+            'underlying_symbol': str,
+            'quote_date': str,
+            'root': str,
+            'expiration': str,
+            'strike': 'float64',
+            'option_type': str,
+            'open': 'float64',
+            'high': 'float64',
+            'low': 'float64',
+            'close': 'float64',
+            'trade_volume': 'float64',
+            'bid_size': 'float64',
+            'bid': 'float64',
+            'ask_size': 'float64',
+            'ask': 'float64',
+            'underlying_price': 'float64',
+            'iv': 'float64',
+            'delta': 'float64',
+            'gamma': 'float64',
+            'theta': 'float64',
+            'vega': 'float64',
+            'rho': 'float64',
+            'open_interest': 'float64'
+        }
+
+        if self.path is None:
+            # use default path if no path given
+            self.path = os.path.join(os.sep, gb.PROJECT_DIR, gb.DATA_SUB_DIR, gb.DB_NAME)
+
+    @staticmethod
+    def _file_date(path):
+        """
+        Return the date in the name of a csv file as 'YYYY-MM-DD', or None.
+        """
+        match = re.search(r'(\d{4})-?(\d{2})-?(\d{2})', os.path.basename(path))
+        return "-".join(match.groups()) if match is not None else None
+
+    def _files(self, start=None, end=None):
+        """
+        Return the csv files to read, in file name order, skipping files with
+        a date in their name outside of the date range.
+
+        :param start: start date of the date range
+        :param end: end date of the date range
+        :return: list of file paths
+        """
+        if os.path.isfile(self.path):
+            return [self.path]
+        elif not os.path.isdir(self.path):
+            raise IOError("No csv files at %s" % self.path)
+
+        files = list()
+
+        for path in sorted(glob.glob(os.path.join(self.path, "*.csv*"))):
+            file_date = self._file_date(path)
+
+            if file_date is not None:
+                if (start is not None and file_date < start) or (end is not None and file_date > end):
+                    continue
+
+            files.append(path)
+
+        return files
+
+    def partitions(self, symbol, start=None, end=None):
+        """
+        Return the date ranges of the months of the csv files between start and end,
+        found with the dates in their file names. Files without a date in their name
+        can hold any quote date, so their option chains cannot be read by month.
+
+        :param symbol: symbol to get the partitions of
+        :param start: start date of the date range
+        :param end: end date of the date range
+        :return: list of (start, end) date tuples
+        """
+        months = set()
+
+        for path in self._files(start, end):
+            file_date = self._file_date(path)
+
+            if file_date is None:
+                raise ValueError("Cannot partition %s by month, its file name has no date" % path)
+
+            months.add(file_date[:7])
+
+        return self._month_ranges(sorted(months), start, end)
+
+    def _chunks(self, symbol, start=None, end=None,
+                exclude_splits=True, option_type=None, requirements=None):
+        """
+        Parse the csv files in chunks, only the mapped columns are parsed.
+
+        :return: generator of normalized and filtered dataframes
+        """
+        mapped = self._mapped_columns(self.opt_params)
+
+        for path in self._files(start, end):
+            header = pd.read_csv(path, nrows=0).columns
+            source_cols = [header[col[1]] for col in mapped]
+            dtypes = {header[col[1]]: self.dtypes[col[0]] for col in mapped if col[0] in self.dtypes}
+
+            chunks = pd.read_csv(path, usecols=set(source_cols), dtype=dtypes, chunksize=self.chunksize)
+
+            for chunk in chunks:
+                # select columns in opt_params order, a source column can map to several columns
+                chunk = chunk[source_cols]
+                chunk.columns = [col[0] for col in mapped]
+
+                mask = chunk['underlying_symbol'] == symbol
+
+                # exclude option chains created from the underlying's stock split
+                if exclude_splits:
+                    mask &= chunk['root'] == symbol
+
+                if option_type in ('c', 'p'):
+                    mask &= chunk['option_type'] == option_type
+
+                if start is not None:
+                    mask &= chunk['quote_date'] >= start
+
+                if end is not None:
+                    mask &= chunk['quote_date'] <= end
+
+                chunk = chunk[mask].reset_index(drop=True)
+                yield chunk if requirements is None else requirements.apply(chunk)
+
+    def get(self, symbol, start=None, end=None,
+            exclude_splits=True, option_type=None, requirements=None):
+        """
+        Read the option chains of a symbol from the csv files.
+
+        :param symbol: symbol to read option data for
+        :param start: start date to retrieve data from
+        :param end: end date to retrieve data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will retrieve both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to retrieve, None retrieves all contracts
+        :return: dataframe containing option chains
+        """
+        chunks = list(self._chunks(symbol, start, end, exclude_splits, option_type, requirements))
+
+        if not chunks:
+            # no file in the date range, normalize an empty frame of the parsed dtypes
+            chunks = [pd.DataFrame({col[0]: pd.Series(dtype=self.dtypes.get(col[0]))
+                                    for col in self._mapped_columns(self.opt_params)})]
+
+        return self._normalize(pd.concat(chunks, ignore_index=True), self.opt_params)
+
+    def stream(self, symbol, start=None, end=None,
+               exclude_splits=True, option_type=None, requirements=None):
+        """
+        Stream the option chains of a symbol one quote date at a time. Files are parsed
+        in chunks, so only the chunks of the current quote date are held in memory.
+
+        :param symbol: symbol to stream option data for
+        :param start: start date to stream data from
+        :param end: end date to stream data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will stream both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to stream, None streams all contracts
+        :return: generator of (quote_date, dataframe) tuples ordered by quote date
+        """
+        chunks = self._chunks(symbol, start, end, exclude_splits, option_type, requirements)
+
+        for quote_date, option_chains in self._days(chunks):
+            yield quote_date, self._normalize(option_chains, self.opt_params)
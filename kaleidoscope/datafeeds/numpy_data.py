@@ -0,0 +1,374 @@
+from .base import BaseDataFeed
+from .sqlite_data import SQLiteDataFeed
+import kaleidoscope.globals as gb
+from kaleidoscope.helpers import derive_columns
+import json
+import os
+import numpy as np
+import pandas as pd
+
+INDEX_FILE = "index.npz"
+META_FILE = "meta.json"
+
+
+def write_chains(path, symbol, data, partition=None):
+    """
+    Write normalized option chains of a symbol to a numpy chain store. Each column is
+    saved to its own .npy file, rows ordered by quote date, together with an index
+    of the row offsets of each quote date.
+
+    With partition='month' each month of quote dates is written to its own store in
+    a subdirectory of the symbol, so a month can be read and released on its own.
+    Months already in the store are replaced, other months are kept.
+
+    :param path: path of the chain store directory
+    :param symbol: symbol of the option chains
+    :param data: dataframe containing normalized option chains
+    :param partition: None to write a single store, 'month' to partition by month
+    :return: None
+    """
+    if partition not in (None, 'month'):
+        raise ValueError("partition must be None or 'month'")
+
+    if partition is None:
+        _write_store(os.path.join(path, symbol), symbol, data)
+        return
+
+    months = pd.to_datetime(data['quote_date']).dt.strftime("%Y-%m")
+
+    for month, month_data in data.groupby(months.values, sort=True):
+        _write_store(os.path.join(path, symbol, month), symbol, month_data)
+
+    _write_partitions(os.path.join(path, symbol), symbol, months.unique())
+
+
+def append_chains(path, symbol, data, cache=None):
+    """
+    Append the option chains of new quote dates to a symbol's numpy chain store, e.g.
+    the chains of the last trading day. Rows of quote dates already in the store are
+    skipped. In a store partitioned by month only the months of the new quote dates
+    are rewritten, a store that is not partitioned is rewritten as a whole.
+
+    :param path: path of the chain store directory
+    :param symbol: symbol of the option chains
+    :param data: dataframe containing normalized option chains
+    :param cache: CachedDataFeed of the chain store, its cached option chains covering
+                  the appended quote dates are invalidated
+    :return: number of rows appended
+    """
+    feed = NumpyDataFeed(path)
+
+    try:
+        meta = feed._meta(symbol)
+    except IOError:
+        # nothing to append to, write a new store
+        write_chains(path, symbol, derive_columns(data))
+        return len(data)
+
+    previous = None if cache is None else cache.signature()
+    partition = 'month' if 'partitions' in meta else None
+
+    data = derive_columns(data)
+    start = data['quote_date'].min().strftime("%Y-%m-%d")
+    end = data['quote_date'].max().strftime("%Y-%m-%d")
+
+    if partition is None:
+        stored = feed.get(symbol, exclude_splits=False)
+    else:
+        # the stored rows of the months being rewritten
+        months = [(month_start, month_end) for month_start, month_end in feed.partitions(symbol)
+                  if month_end >= start and month_start <= end]
+        stored = [feed.get(symbol, month_start, month_end, exclude_splits=False) for month_start, month_end in months]
+        stored = pd.concat(stored, ignore_index=True) if stored else data.iloc[0:0]
+
+    data = data[~data['quote_date'].isin(stored['quote_date'].unique())]
+
+    if data.empty:
+        return 0
+
+    write_chains(path, symbol, pd.concat([stored, data], ignore_index=True), partition)
+
+    if cache is not None:
+        cache.invalidate(symbol, data['quote_date'].min().strftime("%Y-%m-%d"),
+                         data['quote_date'].max().strftime("%Y-%m-%d"), previous)
+
+    return len(data)
+
+
+def _write_partitions(store, symbol, months):
+    """
+    Add months to the partitions listed in the meta file of a partitioned store.
+    """
+    partitions = set(months)
+    meta_path = os.path.join(store, META_FILE)
+
+    if os.path.exists(meta_path):
+        with open(meta_path) as meta:
+            partitions.update(json.load(meta).get('partitions', []))
+
+    meta = json.dumps({'symbol': symbol, 'partitions': sorted(partitions)})
+    _replace(meta_path, lambda f: f.write(meta.encode()))
+
+
+def _replace(path, write):
+    """
+    Write a file next to path and move it over path, so readers memory mapping
+    the previous file keep reading it.
+    """
+    with open(path + ".tmp", 'wb') as f:
+        write(f)
+    os.replace(path + ".tmp", path)
+
+
+def _write_store(store, symbol, data):
+    os.makedirs(store, exist_ok=True)
+
+    data = data.sort_values('quote_date', kind='mergesort').reset_index(drop=True)
+
+    for col in ('quote_date', 'expiration'):
+        data[col] = pd.to_datetime(data[col])
+
+    for col in data.columns:
+        values = data[col].values
+        if values.dtype == object:
+            # store strings with a fixed width so the column can be memory mapped
+            values = values.astype(str)
+        _replace(os.path.join(store, col + ".npy"), lambda f: np.save(f, values))
+
+    # row offsets of each quote date, the rows of dates[i] are offsets[i]:offsets[i + 1]
+    dates, offsets = np.unique(data['quote_date'].values, return_index=True)
+    offsets = np.append(offsets, len(data))
+    _replace(os.path.join(store, INDEX_FILE), lambda f: np.savez(f, dates=dates, offsets=offsets))
+
+    meta = json.dumps({'symbol': symbol, 'columns': list(data.columns)})
+    _replace(os.path.join(store, META_FILE), lambda f: f.write(meta.encode()))
+
+
+def convert_sqlite(path, symbols, db_path=None, exclude_splits=True, partition=None):
+    """
+    One time conversion of option chain tables in a sqlite database to a numpy chain store.
+
+    SQLiteDataFeed maps the root column to the underlying symbol, so options created
+    from stock splits can only be told apart while reading the sqlite table.
+
+    :param path: path of the chain store directory
+    :param symbols: symbols to convert
+    :param db_path: path of the sqlite database, if None use the default database
+    :param exclude_splits: exclude options created from the underlying's stock splits
+    :param partition: None to write a single store per symbol, 'month' to partition
+                      by month, months are then read from the database one at a time
+    :return: None
+    """
+    feed = SQLiteDataFeed(db_path)
+
+    try:
+        for symbol in symbols:
+            if partition is None:
+                write_chains(path, symbol, feed.get(symbol, exclude_splits=exclude_splits))
+            else:
+                for start, end in feed.partitions(symbol):
+                    data = feed.get(symbol, start, end, exclude_splits=exclude_splits)
+                    write_chains(path, symbol, data, partition)
+    finally:
+        feed.close()
+
+
+class NumpyDataFeed(BaseDataFeed):
+    def __init__(self, path=None, compact=False, clean=False):
+        """
+        Data feed for option chains stored in a numpy chain store created by write_chains
+        or convert_sqlite. Columns are memory mapped, so opening a symbol does not read
+        any data and the pages are shared between processes through the OS page cache.
+
+        Stores partitioned by month are opened one month at a time, and the months
+        are released once they have been read.
+
+        :param path: path of the chain store directory
+        :param compact: convert option chains to compact dtypes
+        :param clean: drop bad quotes from option chains, see BaseDataFeed._clean
+        """
+        super().__init__(compact, clean)
+        self.path = path
+
+        # opened chain stores by symbol
+        self.stores = {}
+
+        if self.path is None:
+            # use default path if no path given
+            self.path = os.path.join(os.sep, gb.PROJECT_DIR, gb.DATA_SUB_DIR, gb.DB_NAME)
+
+    def _meta(self, symbol):
+        try:
+            with open(os.path.join(self.path, symbol, META_FILE)) as meta:
+                return json.load(meta)
+        except (IOError, OSError) as err:
+            raise IOError(err)
+
+    def _open(self, symbol, cache=True):
+        """
+        Memory map the columns of a symbol's chain store.
+
+        :param symbol: symbol to open the chain store for, or symbol/month for a partition
+        :param cache: keep the opened store, partitions are not kept so they can be released
+        :return: dict with the column arrays, quote dates and row offsets of the store
+        """
+        if symbol in self.stores:
+            return self.stores[symbol]
+
+        store = os.path.join(self.path, symbol)
+        columns = self._meta(symbol)['columns']
+
+        try:
+            with np.load(os.path.join(store, INDEX_FILE)) as index:
+                dates, offsets = index['dates'], index['offsets']
+        except (IOError, OSError) as err:
+            raise IOError(err)
+
+        opened = {
+            'columns': {col: np.load(os.path.join(store, col + ".npy"), mmap_mode='r') for col in columns},
+            'dates': dates,
+            'offsets': offsets
+        }
+
+        if cache:
+            self.stores[symbol] = opened
+
+        return opened
+
+    def _stores(self, symbol, start=None, end=None):
+        """
+        Open the stores of a symbol holding quote dates between start and end.
+
+        :return: generator of opened stores, one per month for partitioned stores
+        """
+        meta = self._meta(symbol)
+
+        if 'partitions' not in meta:
+            yield self._open(symbol)
+            return
+
+        months = [month for month in meta['partitions']
+                  if (start is None or month >= start[:7]) and (end is None or month <= end[:7])]
+
+        # without a month in range, the rows of a partition outside of it give an empty result
+        for month in months or meta['partitions'][:1]:
+            yield self._open(os.path.join(symbol, month), cache=False)
+
+    def partitions(self, symbol, start=None, end=None):
+        """
+        Return the date ranges of the months of a partitioned store, or the whole date
+        range for a store that is not partitioned.
+
+        :param symbol: symbol to get the partitions of
+        :param start: start date of the date range
+        :param end: end date of the date range
+        :return: list of (start, end) date tuples
+        """
+        meta = self._meta(symbol)
+
+        if 'partitions' not in meta:
+            return [(start, end)]
+
+        return self._month_ranges(meta['partitions'], start, end)
+
+    @staticmethod
+    def _rows(store, start=None, end=None):
+        """
+        Find the range of quote dates in the store between start and end.
+
+        :param store: opened chain store
+        :param start: start date of the range
+        :param end: end date of the range
+        :return: tuple of the first and last + 1 position of the quote dates in range
+        """
+        dates = store['dates']
+
+        first = 0 if start is None else np.searchsorted(dates, np.datetime64(start), side='left')
+        last = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end), side='right')
+
+        return first, last
+
+    def _frame(self, store, lo, hi, symbol, exclude_splits, option_type, requirements):
+        """
+        Build a dataframe from the rows lo:hi of the store. Slicing the memory mapped
+        columns only touches the pages of those rows.
+
+        :return: dataframe containing option chains
+        """
+        columns = store['columns']
+        mask = None
+
+        # exclude option chains created from the underlying's stock split
+        if exclude_splits:
+            mask = columns['root'][lo:hi] == symbol
+
+        if option_type in ('c', 'p'):
+            is_type = columns['option_type'][lo:hi] == option_type
+            mask = is_type if mask is None else mask & is_type
+
+        data = {}
+        for col, values in columns.items():
+            values = values[lo:hi]
+            data[col] = values if mask is None else values[mask]
+
+        data = pd.DataFrame(data, copy=False)
+
+        if requirements is not None:
+            data = requirements.apply(data)
+
+        # stores written from normalized option chains already contain the derived columns
+        return self._prepare(data)
+
+    def get(self, symbol, start=None, end=None,
+            exclude_splits=True, option_type=None, requirements=None):
+        """
+        Read the option chains of a symbol from the chain store.
+
+        :param symbol: symbol to read option data for
+        :param start: start date to retrieve data from
+        :param end: end date to retrieve data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will retrieve both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to retrieve, None retrieves all contracts
+        :return: dataframe containing option chains
+        """
+        frames = list()
+
+        for store in self._stores(symbol, start, end):
+            first, last = self._rows(store, start, end)
+            offsets = store['offsets']
+            frames.append(self._frame(store, offsets[first], offsets[last], symbol,
+                                      exclude_splits, option_type, requirements))
+
+        if len(frames) == 1:
+            return frames[0]
+
+        data = pd.concat(frames, ignore_index=True)
+
+        if self.clean:
+            data.attrs['quality'] = [record for frame in frames for record in frame.attrs['quality']]
+
+        return data
+
+    def stream(self, symbol, start=None, end=None,
+               exclude_splits=True, option_type=None, requirements=None):
+        """
+        Stream the option chains of a symbol one quote date at a time, each quote date
+        is a slice of the store found with the index.
+
+        :param symbol: symbol to stream option data for
+        :param start: start date to stream data from
+        :param end: end date to stream data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will stream both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to stream, None streams all contracts
+        :return: generator of (quote_date, dataframe) tuples ordered by quote date
+        """
+        for store in self._stores(symbol, start, end):
+            first, last = self._rows(store, start, end)
+            offsets = store['offsets']
+
+            for i in range(first, last):
+                option_chains = self._frame(store, offsets[i], offsets[i + 1], symbol,
+                                            exclude_splits, option_type, requirements)
+                yield pd.Timestamp(store['dates'][i]), option_chains
@@ -0,0 +1,215 @@
+from .base import BaseDataFeed
+import kaleidoscope.globals as gb
+import datetime
+import operator
+import os
+import re
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+    ds = None
+
+
+class ParquetDataFeed(BaseDataFeed):
+    def __init__(self, path=None, compact=False, clean=False):
+        """
+        Data feed for option chains stored as a parquet dataset. The dataset can be
+        a single directory of parquet files, partitioned by symbol with a sub directory
+        per symbol, or hive partitioned (e.g. 'quote_date=2016-02-19/part.parquet').
+
+        Column indexes in opt_params refer to the dataset schema, partition columns
+        that are not stored in the files come after the file columns.
+
+        :param path: path of the parquet dataset directory
+        :param compact: convert option chains to compact dtypes
+        :param clean: drop bad quotes from option chains, see BaseDataFeed._clean
+        """
+        if ds is None:
+            raise ImportError("ParquetDataFeed requires the pyarrow package")
+
+        super().__init__(compact, clean)
+        self.path = path
+
+        # unlike SQLiteDataFeed, which filters splits on the root column of the table and maps
+        # root to the underlying symbol, filters are pushed down through this mapping, so root
+        # maps to the root column of the dataset for exclude_splits to skip split options
+        self.opt_params = (
+            ('symbol', 0),
+            ('underlying_symbol', 1),
+            ('quote_date', 2),
+            ('root', 3),
+            ('expiration', 4),
+            ('strike', 5),
+            ('option_type', 6),
+            ('open', -1),
+            ('high', -1),
+            ('low', -1),
+            ('close', -1),
+            ('trade_volume', 11),
+            ('bid_size', -1),
+            ('bid', 13),
+            ('ask_size', -1),
+            ('ask', 15),
+            ('underlying_price', 16),
+            ('iv', -1),
+            ('delta', 18),
+            ('gamma', 19),
+            ('theta', 20),
+            ('vega', 21),
+            ('rho', 22),
+            ('open_interest', -1)
+        )
+
+        if self.path is None:
+            # use default path if no path given
+            self.path = os.path.join(os.sep, gb.PROJECT_DIR, gb.DATA_SUB_DIR, gb.DB_NAME)
+
+    def _dataset(self, symbol):
+        """
+        Open the parquet dataset holding the option chains of a symbol, uses the
+        symbol's sub directory if the dataset is partitioned by symbol.
+
+        :param symbol: symbol to open the dataset for
+        :return: pyarrow dataset
+        """
+        # only plain symbol names, the symbol is used as a directory name
+        if not re.match(r'^\w+$', symbol):
+            raise ValueError("Invalid symbol '%s'" % symbol)
+
+        path = os.path.join(self.path, symbol)
+
+        if not os.path.isdir(path):
+            path = self.path
+
+        if not os.path.exists(path):
+            raise IOError("No parquet dataset at %s" % path)
+
+        return ds.dataset(path, format='parquet', partitioning='hive')
+
+    @staticmethod
+    def _scalar(field_type, value):
+        """
+        Convert a filter value to a scalar of the column's type so the comparison
+        can be pushed down to the parquet reader.
+
+        :param field_type: pyarrow data type of the column
+        :param value: value to compare the column with
+        :return: pyarrow scalar
+        """
+        if pa.types.is_date(field_type):
+            return pa.scalar(pd.Timestamp(value).date(), type=field_type)
+        elif pa.types.is_timestamp(field_type):
+            return pa.scalar(pd.Timestamp(value).to_pydatetime(), type=field_type)
+        elif isinstance(value, (datetime.date, pd.Timestamp)):
+            return pa.scalar(pd.Timestamp(value).strftime("%Y-%m-%d"), type=field_type)
+
+        return pa.scalar(value, type=field_type)
+
+    def _source(self, dataset):
+        """
+        Return the fields of the dataset schema mapped to each column in opt_params.
+        """
+        schema = dataset.schema
+        return {col[0]: schema.field(col[1]) for col in self._mapped_columns(self.opt_params)}
+
+    def _predicate(self, source, symbol, start=None, end=None,
+                   exclude_splits=True, option_type=None, requirements=None):
+        """
+        Build the filter expression pushed down to the parquet reader.
+
+        :param source: fields of the dataset schema by column name, see _source
+        :return: pyarrow expression
+        """
+        params = [('underlying_symbol', operator.eq, symbol)]
+
+        # exclude option chains created from the underlying's stock split
+        if exclude_splits:
+            params.append(('root', operator.eq, symbol))
+
+        if option_type in ('c', 'p'):
+            params.append(('option_type', operator.eq, option_type))
+
+        if start is not None:
+            params.append(('quote_date', operator.ge, start))
+            # options expired before the start date have no quotes in the date range
+            params.append(('expiration', operator.ge, start))
+
+        if end is not None:
+            params.append(('quote_date', operator.le, end))
+
+        if requirements is not None:
+            # push the expirations that can meet the dte requirement down to the reader
+            first, last = requirements.expirations(start, end)
+
+            if first is not None:
+                params.append(('expiration', operator.ge, first))
+
+            if last is not None:
+                params.append(('expiration', operator.le, last))
+
+        predicate = None
+        for name, op, value in params:
+            field = source[name]
+            expr = op(ds.field(field.name), self._scalar(field.type, value))
+            predicate = expr if predicate is None else predicate & expr
+
+        return predicate
+
+    def get(self, symbol, start=None, end=None,
+            exclude_splits=True, option_type=None, requirements=None):
+        """
+        Read the option chains of a symbol from the parquet dataset. Only the mapped
+        columns are read and the filters are pushed down to the reader, so row groups
+        and partitions outside of the filters are skipped.
+
+        :param symbol: symbol to read option data for
+        :param start: start date to retrieve data from
+        :param end: end date to retrieve data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will retrieve both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to retrieve, None retrieves all contracts
+        :return: dataframe containing option chains
+        """
+        dataset = self._dataset(symbol)
+        source = self._source(dataset)
+        predicate = self._predicate(source, symbol, start, end, exclude_splits, option_type, requirements)
+
+        columns = {name: ds.field(field.name) for name, field in source.items()}
+
+        try:
+            table = dataset.to_table(columns=columns, filter=predicate)
+        except pa.ArrowInvalid as err:
+            raise IOError(err)
+
+        data = table.to_pandas(date_as_object=False)
+
+        if requirements is not None:
+            data = requirements.apply(data)
+
+        return self._normalize(data, self.opt_params)
+
+    def partitions(self, symbol, start=None, end=None):
+        """
+        Return the date ranges of the months with option chains of a symbol between start
+        and end, only the quote date column of the dataset is read to find them.
+
+        :param symbol: symbol to get the partitions of
+        :param start: start date of the date range
+        :param end: end date of the date range
+        :return: list of (start, end) date tuples
+        """
+        dataset = self._dataset(symbol)
+        source = self._source(dataset)
+        predicate = self._predicate(source, symbol, start, end, exclude_splits=False)
+
+        try:
+            table = dataset.to_table(columns=[source['quote_date'].name], filter=predicate)
+        except pa.ArrowInvalid as err:
+            raise IOError(err)
+
+        quote_dates = pd.to_datetime(pd.Series(table.column(0).to_pandas()))
+        return self._month_ranges(sorted(quote_dates.dt.strftime("%Y-%m").unique()), start, end)
@@ -0,0 +1,134 @@
+import datetime
+
+import pandas as pd
+
+from kaleidoscope.globals import Period
+
+
+class Requirements(object):
+    """
+    Describes the option contracts a strategy can trade, so data feeds can skip
+    the rows outside of it when reading option chains. Each requirement is a
+    (min, max) band, either bound can be None.
+    """
+
+    def __init__(self, dte=None, moneyness=None, delta=None):
+        """
+        :param dte: band of days to expiration, bounds can be Period instances
+        :param moneyness: band of strike / underlying price
+        :param delta: band of absolute delta, e.g. (0.2, 0.5) for both calls and puts
+        """
+        self.dte = self._band(dte)
+        self.moneyness = self._band(moneyness)
+        self.delta = self._band(delta)
+
+    @staticmethod
+    def _band(band):
+        if band is None:
+            return None
+
+        if len(band) != 2:
+            raise ValueError("Requirements must be (min, max) tuples")
+
+        return tuple(bound.value if isinstance(bound, Period) else bound for bound in band)
+
+    def __repr__(self):
+        return "Requirements(dte=%r, moneyness=%r, delta=%r)" % (self.dte, self.moneyness, self.delta)
+
+    def __eq__(self, other):
+        return isinstance(other, Requirements) and self._bands() == other._bands()
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash(self._bands())
+
+    def _bands(self):
+        return (('dte', self.dte), ('moneyness', self.moneyness), ('delta', self.delta))
+
+    def sql(self):
+        """
+        Return the requirements as sql clauses on the option chain table columns.
+
+        :return: tuple of list of clauses and list of bound parameters
+        """
+        expressions = {
+            'dte': "julianday(expiration) - julianday(quote_date)",
+            'moneyness': "strike / underlying_price",
+            'delta': "abs(delta)"
+        }
+
+        clauses = list()
+        args = list()
+
+        for name, band in self._bands():
+            if band is None:
+                continue
+
+            if band[0] is not None:
+                clauses.append("%s >= ?" % expressions[name])
+                args.append(band[0])
+
+            if band[1] is not None:
+                clauses.append("%s <= ?" % expressions[name])
+                args.append(band[1])
+
+        return clauses, args
+
+    def expirations(self, start=None, end=None):
+        """
+        Return the range of expirations that can meet the dte requirement for quote
+        dates between start and end, for data sources that can only filter on columns.
+
+        :param start: start date of the quote dates
+        :param end: end date of the quote dates
+        :return: tuple of the first and last expiration as 'YYYY-MM-DD', None if unbounded
+        """
+        first = last = None
+
+        if self.dte is not None:
+            if start is not None and self.dte[0] is not None:
+                first = pd.Timestamp(start) + datetime.timedelta(days=self.dte[0])
+                first = first.strftime("%Y-%m-%d")
+
+            if end is not None and self.dte[1] is not None:
+                last = pd.Timestamp(end) + datetime.timedelta(days=self.dte[1])
+                last = last.strftime("%Y-%m-%d")
+
+        return first, last
+
+    def apply(self, data):
+        """
+        Filter normalized option chains for the rows meeting the requirements.
+
+        :param data: dataframe containing option chains
+        :return: the filtered dataframe
+        """
+        mask = pd.Series(True, index=data.index)
+
+        for name, band in self._bands():
+            if band is None:
+                continue
+
+            # use the derived columns of normalized option chains when present
+            if name == 'dte':
+                if 't_delta' in data.columns:
+                    values = data['t_delta']
+                else:
+                    values = (pd.to_datetime(data['expiration']) - pd.to_datetime(data['quote_date'])).dt.days
+            elif name == 'moneyness':
+                if 'moneyness' in data.columns:
+                    values = data['moneyness']
+                else:
+                    values = data['strike'] / data['underlying_price']
+            else:
+                values = data['delta'].abs()
+
+            if band[0] is not None:
+                mask &= values >= band[0]
+
+            if band[1] is not None:
+                mask &= values <= band[1]
+
+        return data if mask.all() else data[mask].reset_index(drop=True)
@@ -1,13 +1,36 @@
 from .base import BaseDataFeed
 import kaleidoscope.globals as gb
 import os
+import re
 import sqlite3
+import threading
 import pandas as pd
+from urllib.request import pathname2url
+
+# compound selects per query in get_many, sqlite allows at most 500 by default
+MAX_COMPOUND_SELECT = 100
 
 
 class SQLiteDataFeed(BaseDataFeed):
-    def __init__(self, path=None):
+    batch_symbols = True
+
+    def __init__(self, path=None, chunksize=None, compact=False, clean=False):
+        super().__init__(compact, clean)
         self.path = path
+        # rows to read at a time when streaming, if None stream one quote date per query
+        self.chunksize = chunksize
+
+        # pragmas applied to the read-only connections
+        self.pragmas = {
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,
+            'temp_store': 'MEMORY'
+        }
+
+        # one persistent read-only connection per thread
+        self._local = threading.local()
+        self._connections = list()
+        self._lock = threading.Lock()
 
         self.opt_params = (
             ('symbol', 0),
@@ -40,19 +63,89 @@ class SQLiteDataFeed(BaseDataFeed):
             # use default path if no path given
             self.path = os.path.join(os.sep, gb.PROJECT_DIR, gb.DATA_SUB_DIR, gb.DB_NAME + ".db")
 
-    def get(self, symbol, start=None, end=None,
-            exclude_splits=True, option_type=None):
+    def _connection(self):
         """
-        Data provider wrapper around pandas read_sql_query for sqlite database.
+        Return the calling thread's read-only connection to the database, the connection
+        is opened on first use and kept open until close is called.
 
-        :param symbol: symbol to download option data for
+        :return: sqlite connection
+        """
+        data_conn = getattr(self._local, 'conn', None)
+
+        if data_conn is None:
+            uri = "file:%s?mode=ro" % pathname2url(os.path.abspath(self.path))
+
+            try:
+                data_conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            except sqlite3.OperationalError as err:
+                raise IOError("%s: %s" % (err, self.path))
+
+            for pragma, value in self.pragmas.items():
+                data_conn.execute("PRAGMA %s = %s" % (pragma, value))
+
+            with self._lock:
+                self._connections.append(data_conn)
+
+            self._local.conn = data_conn
+
+        return data_conn
+
+    def close(self):
+        """
+        Close all connections opened by this data feed.
+        """
+        with self._lock:
+            for data_conn in self._connections:
+                data_conn.close()
+            self._connections = list()
+            self._local = threading.local()
+
+    @staticmethod
+    def _table(symbol):
+        """
+        Return the name of the option chain table of a symbol. Table names cannot be
+        bound as query parameters, so only plain symbol names are accepted.
+
+        :param symbol: symbol to get the option chain table name for
+        :return: option chain table name
+        """
+        if not re.match(r'^\w+$', symbol):
+            raise ValueError("Invalid symbol '%s'" % symbol)
+
+        return "%s_option_chain" % symbol
+
+    def _select(self, data_conn, table):
+        """
+        Build the select list of the columns mapped in opt_params, aliased with
+        the standard column names so the result does not need to be normalized.
+
+        :param data_conn: sqlite connection to read the table schema from
+        :param table: option chain table to select from
+        :return: select list for the option chain query
+        """
+        source_cols = [row[1] for row in data_conn.execute('PRAGMA table_info("%s")' % table)]
+
+        if not source_cols:
+            raise IOError("No option chain table '%s' in %s" % (table, self.path))
+
+        return ", ".join('"%s" AS "%s"' % (source_cols[col[1]], col[0])
+                         for col in self._mapped_columns(self.opt_params))
+
+    def _query(self, data_conn, symbol, start=None, end=None,
+               exclude_splits=True, option_type=None, requirements=None):
+        """
+        Build the option chain query and its bound parameters.
+
+        :param data_conn: sqlite connection to read the table schema from
+        :param symbol: symbol to query option data for
         :param start: start date to retrieve data from
         :param end: end date to retrieve data to
         :param exclude_splits: exclude options created from the underlying's stock splits
         :param option_type: If None, or not passed in, will retrieve both calls and puts of option chain
-        :return: dataframe containing option chains
+        :param requirements: Requirements of the option contracts to retrieve, None retrieves all contracts
+        :return: tuple of the query's FROM/WHERE clause, select list and list of bound parameters
         """
-        # TODO: allow for various start and end date configurations
+        table = self._table(symbol)
 
         params = {}
 
@@ -66,33 +159,138 @@ class SQLiteDataFeed(BaseDataFeed):
         if option_type == 'p':
             params['option_type'] = 'p'
 
-        try:
-            data_conn = sqlite3.connect(self.path)
+        # Build the query components as needed, values are bound as query parameters
+        clauses = list()
+        args = list()
+
+        if start is not None:
+            clauses.append("quote_date >= ?")
+            args.append(start)
+
+        if end is not None:
+            clauses.append("quote_date <= ?")
+            args.append(end)
+
+        for k, v in params.items():
+            clauses.append("%s = ?" % k)
+            args.append(v)
 
-            query = "SELECT * FROM %s_option_chain" % symbol
+        if requirements is not None:
+            req_clauses, req_args = requirements.sql()
+            clauses += req_clauses
+            args += req_args
 
-            # Build the query components as needed
-            if start is not None and end is None:
-                query += " WHERE expiration >= '%s'" % start
-            elif start is None and end is not None:
-                query += " WHERE expiration <= '%s'" % end
-            elif start is not None and end is not None:
-                query += " WHERE expiration >= '%s' AND expiration <= '%s'" % (start, end)
+        query = " FROM %s WHERE %s" % (table, " AND ".join(clauses) if clauses else "1")
+        return query, self._select(data_conn, table), args
 
-            # loop through opt_params, assign filter by column if applicable
-            if params is not None:
-                query += " AND"
-                for k, v in params.items():
-                    query += " %s = '%s' AND" % (k, v)
-                # remove the trailing 'AND'
-                query = query[:-4]
+    def get(self, symbol, start=None, end=None,
+            exclude_splits=True, option_type=None, requirements=None):
+        """
+        Data provider wrapper around pandas read_sql_query for sqlite database.
 
-            # may need to apply chunk size if loading large option chain set
-            data = pd.read_sql_query(query, data_conn)
+        :param symbol: symbol to download option data for
+        :param start: start date to retrieve data from
+        :param end: end date to retrieve data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will retrieve both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to retrieve, None retrieves all contracts
+        :return: dataframe containing option chains
+        """
+        try:
+            data_conn = self._connection()
 
-            # normalize dataframe columns
-            data = self._normalize(data, self.opt_params)
-            return data
+            query, select, args = self._query(data_conn, symbol, start, end,
+                                              exclude_splits, option_type, requirements)
+            data = pd.read_sql_query("SELECT " + select + query, data_conn, params=args)
+            return self._normalize(data, self.opt_params)
 
         except IOError as err:
             raise IOError(err)
+
+    def partitions(self, symbol, start=None, end=None):
+        """
+        Return the date ranges of the months with option chains of a symbol between start
+        and end, found with the quote_date index.
+
+        :param symbol: symbol to get the partitions of
+        :param start: start date of the date range
+        :param end: end date of the date range
+        :return: list of (start, end) date tuples
+        """
+        data_conn = self._connection()
+        query, _, args = self._query(data_conn, symbol, start, end, exclude_splits=False)
+
+        months = data_conn.execute("SELECT DISTINCT substr(quote_date, 1, 7) AS month" + query +
+                                   " ORDER BY month", args).fetchall()
+
+        return self._month_ranges([month for (month,) in months], start, end)
+
+    def get_many(self, symbols, start=None, end=None,
+                 exclude_splits=True, option_type=None, requirements=None):
+        """
+        Get the option chains of several symbols in one pass, the queries of all
+        symbol tables are combined with UNION ALL.
+
+        :param symbols: symbols to download option data for
+        :param start: start date to retrieve data from
+        :param end: end date to retrieve data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will retrieve both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to retrieve, None retrieves all contracts
+        :return: dict of dataframes containing option chains by symbol
+        """
+        data_conn = self._connection()
+        symbols = list(symbols)
+        chains = dict()
+
+        for i in range(0, len(symbols), MAX_COMPOUND_SELECT):
+            batch = symbols[i:i + MAX_COMPOUND_SELECT]
+            queries = list()
+            args = list()
+
+            for symbol in batch:
+                query, select, query_args = self._query(data_conn, symbol, start, end,
+                                                        exclude_splits, option_type, requirements)
+                # tag each row with its symbol, the underlying symbol column may not identify the table
+                queries.append("SELECT ? AS _table_symbol, " + select + query)
+                args += [symbol] + query_args
+
+            data = pd.read_sql_query(" UNION ALL ".join(queries), data_conn, params=args)
+            groups = dict(list(data.groupby('_table_symbol', sort=False)))
+
+            for symbol in batch:
+                option_chains = groups.get(symbol, data.iloc[0:0])
+                option_chains = option_chains.drop('_table_symbol', axis=1).reset_index(drop=True)
+                chains[symbol] = self._normalize(option_chains, self.opt_params)
+
+        return chains
+
+    def stream(self, symbol, start=None, end=None,
+               exclude_splits=True, option_type=None, requirements=None):
+        """
+        Stream the option chains of a symbol one quote date at a time. If chunksize
+        is set, the option chains are read in quote_date order in chunks of chunksize
+        rows, otherwise each quote date is fetched on demand with its own query.
+
+        :param symbol: symbol to stream option data for
+        :param start: start date to stream data from
+        :param end: end date to stream data to
+        :param exclude_splits: exclude options created from the underlying's stock splits
+        :param option_type: If None, or not passed in, will stream both calls and puts of option chain
+        :param requirements: Requirements of the option contracts to stream, None streams all contracts
+        :return: generator of (quote_date, dataframe) tuples ordered by quote date
+        """
+        data_conn = self._connection()
+        query, select, args = self._query(data_conn, symbol, start, end, exclude_splits, option_type, requirements)
+
+        if self.chunksize is not None:
+            chunks = pd.read_sql_query("SELECT " + select + query + " ORDER BY quote_date",
+                                       data_conn, params=args, chunksize=self.chunksize)
+            for quote_date, option_chains in self._days(chunks):
+                yield quote_date, self._normalize(option_chains, self.opt_params)
+        else:
+            dates = data_conn.execute("SELECT DISTINCT quote_date" + query + " ORDER BY quote_date", args)
+            for (quote_date,) in dates.fetchall():
+                option_chains = pd.read_sql_query("SELECT " + select + query + " AND quote_date = ?",
+                                                  data_conn, params=args + [quote_date])
+                yield quote_date, self._normalize(option_chains, self.opt_params)
@@ -0,0 +1,278 @@
+"""
+Create and fill the <symbol>_option_chain tables read by SQLiteDataFeed.
+
+Usage:
+    python -m kaleidoscope.datafeeds.sqlite_ingest SYMBOL FILE [FILE ...] [--db PATH] [--without-rowid]
+    python -m kaleidoscope.datafeeds.sqlite_ingest SYMBOL --index-only [--db PATH]
+    python -m kaleidoscope.datafeeds.sqlite_ingest SYMBOL FILE [FILE ...] --append [--db PATH]
+"""
+import argparse
+import os
+import sqlite3
+
+import pandas as pd
+
+import kaleidoscope.globals as gb
+from .sqlite_data import SQLiteDataFeed
+
+# column layout of the option chain tables, in the order mapped by SQLiteDataFeed.opt_params
+OPTION_CHAIN_COLUMNS = (
+    ('symbol', 'TEXT'),
+    ('underlying_symbol', 'TEXT'),
+    ('quote_date', 'TEXT'),
+    ('root', 'TEXT'),
+    ('expiration', 'TEXT'),
+    ('strike', 'REAL'),
+    ('option_type', 'TEXT'),
+    ('open', 'REAL'),
+    ('high', 'REAL'),
+    ('low', 'REAL'),
+    ('close', 'REAL'),
+    ('trade_volume', 'INTEGER'),
+    ('bid_size', 'INTEGER'),
+    ('bid', 'REAL'),
+    ('ask_size', 'INTEGER'),
+    ('ask', 'REAL'),
+    ('underlying_price', 'REAL'),
+    ('iv', 'REAL'),
+    ('delta', 'REAL'),
+    ('gamma', 'REAL'),
+    ('theta', 'REAL'),
+    ('vega', 'REAL'),
+    ('rho', 'REAL'),
+    ('open_interest', 'INTEGER')
+)
+
+# key of a quote, used for the composite index or the clustered primary key
+INDEX_COLUMNS = ('root', 'quote_date', 'expiration', 'option_type', 'strike')
+
+
+def default_path():
+    """
+    Return the path of the default sqlite database.
+    """
+    return os.path.join(os.sep, gb.PROJECT_DIR, gb.DATA_SUB_DIR, gb.DB_NAME + ".db")
+
+
+def create_table(data_conn, symbol, without_rowid=False):
+    """
+    Create the option chain table of a symbol if it does not exist.
+
+    :param data_conn: sqlite connection
+    :param symbol: symbol to create the option chain table for
+    :param without_rowid: store the table clustered by INDEX_COLUMNS in a WITHOUT ROWID
+                          table, rows of a quote date are then stored next to each other,
+                          otherwise INDEX_COLUMNS are made unique with the key index
+    :return: None
+    """
+    table = SQLiteDataFeed._table(symbol)
+    columns = ", ".join("%s %s" % col for col in OPTION_CHAIN_COLUMNS)
+
+    if without_rowid:
+        columns += ", PRIMARY KEY (%s)" % ", ".join(INDEX_COLUMNS)
+
+    data_conn.execute("CREATE TABLE IF NOT EXISTS %s (%s)%s" %
+                      (table, columns, " WITHOUT ROWID" if without_rowid else ""))
+
+    # the key must exist before inserting, so INSERT OR REPLACE replaces quotes ingested again
+    if not _without_rowid(data_conn, table):
+        _create_key(data_conn, table)
+
+
+def _create_key(data_conn, table):
+    """
+    Create the unique key index of a rowid table. A key index created as not unique by
+    an older version is rebuilt as unique, keeping the last inserted row of each key.
+    """
+    index = [row for row in data_conn.execute('PRAGMA index_list("%s")' % table) if row[1] == table + "_key"]
+
+    if index and not index[0][2]:
+        data_conn.execute("DELETE FROM %s WHERE rowid NOT IN (SELECT max(rowid) FROM %s GROUP BY %s)" %
+                          (table, table, ", ".join(INDEX_COLUMNS)))
+        data_conn.execute("DROP INDEX %s_key" % table)
+
+    data_conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS %s_key ON %s (%s)" % (table, table, ", ".join(INDEX_COLUMNS)))
+
+
+def create_indexes(data_conn, symbol):
+    """
+    Create the indexes of the option chain table of a symbol and update the
+    statistics used by the query planner.
+
+    :param data_conn: sqlite connection
+    :param symbol: symbol to index the option chain table for
+    :return: None
+    """
+    table = SQLiteDataFeed._table(symbol)
+
+    # a WITHOUT ROWID table is already clustered by its primary key
+    if not _without_rowid(data_conn, table):
+        _create_key(data_conn, table)
+
+    # for queries that do not filter on root, e.g. when including options from stock splits
+    data_conn.execute("CREATE INDEX IF NOT EXISTS %s_quote_date ON %s (quote_date)" % (table, table))
+    data_conn.execute("ANALYZE %s" % table)
+
+
+def _without_rowid(data_conn, table):
+    sql = data_conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return sql is not None and sql[0].upper().rstrip().endswith("WITHOUT ROWID")
+
+
+def _dates_as_text(data):
+    """
+    Convert the date columns to 'YYYY-MM-DD' text, which SQLiteDataFeed compares as strings.
+    """
+    for col in ('quote_date', 'expiration'):
+        if str(data[col].dtype).startswith('datetime'):
+            data = data.assign(**{col: data[col].dt.strftime("%Y-%m-%d")})
+
+    return data
+
+
+def _chunks(data, chunksize):
+    """
+    Return the option chains to ingest as dataframes, csv files are read in chunks.
+    """
+    if isinstance(data, pd.DataFrame):
+        return [data]
+
+    return (chunk for csv in data for chunk in pd.read_csv(csv, chunksize=chunksize))
+
+
+def _insert(data_conn, symbol, data):
+    """
+    Insert option chains into the option chain table of a symbol. Columns of data are
+    matched by name, columns of the table missing in data are set to NULL.
+
+    :param data_conn: sqlite connection
+    :param symbol: symbol of the option chain table
+    :param data: dataframe containing option chains
+    :return: number of rows inserted
+    """
+    table = SQLiteDataFeed._table(symbol)
+    names = [col[0] for col in OPTION_CHAIN_COLUMNS]
+
+    data = _dates_as_text(data.reindex(columns=names))
+    data = data.sort_values(list(INDEX_COLUMNS), kind='mergesort')
+    data = data.astype(object).where(data.notnull(), None)
+
+    data_conn.executemany("INSERT OR REPLACE INTO %s VALUES (%s)" % (table, ", ".join("?" * len(names))),
+                          data.itertuples(index=False, name=None))
+
+    return len(data)
+
+
+def ingest(symbol, data, path=None, without_rowid=False, chunksize=100000):
+    """
+    Create the option chain table of a symbol, fill it and build its indexes.
+
+    :param symbol: symbol to ingest option chains for
+    :param data: dataframe containing option chains, or a list of csv file paths.
+                 Columns are matched by name with OPTION_CHAIN_COLUMNS.
+    :param path: path of the sqlite database, if None use the default database
+    :param without_rowid: create the table as a clustered WITHOUT ROWID table
+    :param chunksize: rows to read at a time from csv files
+    :return: number of rows ingested
+    """
+    if path is None:
+        path = default_path()
+
+    data_conn = sqlite3.connect(path)
+
+    try:
+        with data_conn:
+            create_table(data_conn, symbol, without_rowid)
+            rows = sum(_insert(data_conn, symbol, chunk) for chunk in _chunks(data, chunksize))
+            create_indexes(data_conn, symbol)
+    finally:
+        data_conn.close()
+
+    return rows
+
+
+def append(symbol, data, path=None, chunksize=100000, cache=None):
+    """
+    Append the option chains of new quote dates to the option chain table of a symbol,
+    e.g. the chains of the last trading day. Rows of quote dates already in the table
+    are skipped, so appending a day again does nothing. The indexes are updated by the
+    inserts, only the query planner statistics are refreshed if needed.
+
+    :param symbol: symbol to append option chains for
+    :param data: dataframe containing option chains, or a list of csv file paths
+    :param path: path of the sqlite database, if None use the default database
+    :param chunksize: rows to read at a time from csv files
+    :param cache: CachedDataFeed of the database, its cached option chains covering
+                  the appended quote dates are invalidated
+    :return: number of rows appended
+    """
+    if path is None:
+        path = default_path()
+
+    table = SQLiteDataFeed._table(symbol)
+    data_conn = sqlite3.connect(path)
+
+    rows = 0
+    appended = set()
+
+    # signature of the database before appending, cached option chains are kept valid from it
+    previous = None if cache is None else cache.signature()
+
+    try:
+        with data_conn:
+            created = data_conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                        (table,)).fetchone() is None
+            create_table(data_conn, symbol)
+
+            stored = set(row[0] for row in data_conn.execute("SELECT DISTINCT quote_date FROM %s" % table))
+
+            for chunk in _chunks(data, chunksize):
+                chunk = _dates_as_text(chunk)
+                chunk = chunk[~chunk['quote_date'].isin(stored)]
+
+                if chunk.empty:
+                    continue
+
+                rows += _insert(data_conn, symbol, chunk)
+                appended.update(chunk['quote_date'].unique())
+
+            if created:
+                create_indexes(data_conn, symbol)
+            else:
+                data_conn.execute("PRAGMA optimize")
+    finally:
+        data_conn.close()
+
+    if cache is not None and appended:
+        cache.invalidate(symbol, min(appended), max(appended), previous)
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest option chains into a sqlite database")
+    parser.add_argument('symbol', help="symbol of the option chains")
+    parser.add_argument('files', nargs='*', help="csv files containing option chains")
+    parser.add_argument('--db', default=None, help="path of the sqlite database")
+    parser.add_argument('--without-rowid', action='store_true', help="create a clustered WITHOUT ROWID table")
+    parser.add_argument('--index-only', action='store_true', help="only create indexes of an existing table")
+    parser.add_argument('--append', action='store_true', help="append new quote dates to an existing table")
+    args = parser.parse_args(argv)
+
+    if args.index_only:
+        data_conn = sqlite3.connect(args.db or default_path())
+        try:
+            with data_conn:
+                create_indexes(data_conn, args.symbol)
+        finally:
+            data_conn.close()
+    elif args.append:
+        rows = append(args.symbol, args.files, args.db)
+        print("Appended {0} rows to {1}".format(rows, SQLiteDataFeed._table(args.symbol)))
+    else:
+        rows = ingest(args.symbol, args.files, args.db, args.without_rowid)
+        print("Ingested {0} rows into {1}".format(rows, SQLiteDataFeed._table(args.symbol)))
+
+
+if __name__ == '__main__':
+    main()
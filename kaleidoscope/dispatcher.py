@@ -0,0 +1,79 @@
+import collections
+import queue
+
+
+class EventQueue(collections.deque):
+    """
+    Single threaded FIFO queue of events. It provides the put, get and empty methods
+    of queue.Queue used by the broker and strategies, without the locking of a queue
+    shared between threads.
+    """
+
+    put = collections.deque.append
+
+    def get(self, block=False):
+        """
+        Remove and return the oldest event, events are never waited for.
+
+        :param block: ignored, present for compatibility with queue.Queue
+        :return: the oldest event
+        """
+        if not self:
+            raise queue.Empty
+
+        return self.popleft()
+
+    def empty(self):
+        return not self
+
+
+class Dispatcher(object):
+    def __init__(self, events):
+        """
+        Dispatch the events of a queue to the handlers registered for their event type.
+
+        A backtest day has explicit phases: the broker puts the day's data event, and
+        the fills of working orders it updated, into the queue, then dispatch runs the
+        handlers until the orders and fills they create are all handled.
+
+        :param events: EventQueue the broker and strategies put events in
+        """
+        self.events = events
+        self.handlers = dict()
+
+    def register(self, event_type, handler):
+        """
+        Register the handler of an event type, replacing its current handler.
+
+        :param event_type: EventType of the events to handle
+        :param handler: callable receiving the event
+        :return: None
+        """
+        self.handlers[event_type] = handler
+
+    def dispatch(self):
+        """
+        Handle queued events in order until the queue is empty, events queued by the
+        handlers are handled in the same call.
+
+        :return: number of events handled
+        """
+        events = self.events
+        handlers = self.handlers
+        handled = 0
+
+        while events:
+            event = events.popleft()
+
+            if event is None:
+                continue
+
+            try:
+                handler = handlers[event.event_type]
+            except KeyError:
+                raise NotImplementedError("Unsupported event.type '%s'" % event.event_type)
+
+            handler(event)
+            handled += 1
+
+        return handled
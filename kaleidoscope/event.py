@@ -1,7 +1,15 @@
+import logging
 from enum import Enum
 
+import pandas as pd
+
+from kaleidoscope.options.chain_store import to_frame
+from kaleidoscope.options.option_query import OptionQuery
+
 EventType = Enum("EventType", "DATA ORDER FILL REJECTED")
 
+logger = logging.getLogger(__name__)
+
 
 class Event(object):
     """
@@ -10,6 +18,8 @@ class Event(object):
     trading infrastructure.
     """
 
+    __slots__ = ('event_type', 'date')
+
     def __init__(self, event_type, date):
         self.event_type = event_type
         self.date = date
@@ -17,27 +27,89 @@ class Event(object):
     def print_event(self):
         pass
 
+    def _log(self, verb):
+        """
+        Log the order of the event, the order is only formatted if the message is logged.
+
+        :param verb: what happened to the order, e.g. OPENED or FILLED
+        """
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("ORDER #%s %s ON %s: %s", self.order.ticket, verb,
+                        pd.Timestamp(self.date).strftime('%Y-%m-%d'), self.order)
+
 
 class DataEvent(Event):
 
-    def __init__(self, date, quotes):
+    __slots__ = ('_chains', '_joined', '_option_chains', '_quotes')
+
+    def __init__(self, date, option_chains):
         """
         A Data Event is generated by the data feed when it retrieves latest quotes
-        from the data source as called by the option chain iterator. It contains an
-        OptionQuery object 'quotes' to be fed into the broker to update pending orders
-        and account positions. It is also fed to the strategy to be used to generate trading
-        actions.
+        from the data source as called by the option chain iterator. It contains the
+        daily option chains to be fed into the broker to update pending orders and
+        account positions. It is also fed to the strategy as an OptionQuery object
+        'quotes' to be used to generate trading actions.
 
         :param date: The date of the quotes
-        :param quotes: A DataFrame containing option chains for all subscribed symbols
+        :param option_chains: A DataFrame containing option chains for all subscribed symbols,
+                              or a dict of the option chains of each subscribed symbol, option
+                              chains can be ChainDays of a chain store, joined when first used
         """
 
         super().__init__(EventType.DATA, date)
-        self.quotes = quotes
+        self._chains = option_chains
+        self._joined = False
+        self._option_chains = None
+        self._quotes = None
+
+    @property
+    def chains(self):
+        """
+        Option chains of the event as given, with the ChainDays of a chain store joined
+        with their contracts when first accessed.
+        """
+        if not self._joined:
+            if isinstance(self._chains, dict):
+                self._chains = {symbol: to_frame(chains) for symbol, chains in self._chains.items()}
+            else:
+                self._chains = to_frame(self._chains)
+
+            self._joined = True
+
+        return self._chains
+
+    @property
+    def option_chains(self):
+        """
+        DataFrame of the option chains of all symbols, option chains kept apart by symbol
+        are only combined when first accessed.
+        """
+        if self._option_chains is None:
+            if not isinstance(self.chains, dict):
+                self._option_chains = self.chains
+            elif len(self.chains) == 1:
+                self._option_chains = next(iter(self.chains.values()))
+            else:
+                self._option_chains = pd.concat(list(self.chains.values()), ignore_index=True)
+
+        return self._option_chains
+
+    @property
+    def quotes(self):
+        """
+        OptionQuery of the option chains, only built when first accessed, so days
+        the strategy does not query cost no copy of the option chains.
+        """
+        if self._quotes is None:
+            self._quotes = OptionQuery(self.chains)
+
+        return self._quotes
 
 
 class OrderEvent(Event):
 
+    __slots__ = ('order',)
+
     def __init__(self, date, order):
         """
         An Order Event is created by the strategy class to hold an order request
@@ -54,13 +126,15 @@ class OrderEvent(Event):
 
     def print_event(self):
         """
-        Outputs the values within the OrderEvent.
+        Logs the values within the OrderEvent.
         """
-        print(f"ORDER #{self.order.ticket} OPENED ON {self.date}: {self.order}")
+        self._log("OPENED")
 
 
 class FillEvent(Event):
 
+    __slots__ = ('order', 'mark', 'ticket', 'action', 'quantity', 'cost', 'margin', 'commission')
+
     def __init__(self, date, order):
         """
         A Fill event is generated by the broker when an order has passed all
@@ -83,10 +157,13 @@ class FillEvent(Event):
         self.print_event()
 
     def print_event(self):
-        print(f"ORDER #{self.order.ticket} FILLED ON {self.date}: {self.order}")
+        self._log("FILLED")
 
 
 class RejectedEvent(Event):
+
+    __slots__ = ('order',)
+
     def __init__(self, date, order):
         """
         A Rejected Event is generated when a newly submitted order does not meet
@@ -99,4 +176,4 @@ class RejectedEvent(Event):
         self.order = order
 
     def print_event(self):
-        print(f"ORDER #{self.order.ticket} REJECTED ON {self.date}: {self.order}")
+        self._log("REJECTED")
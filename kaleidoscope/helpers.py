@@ -1,6 +1,24 @@
+import logging
 import pandas as pd
 import re
 
+# columns derived from the quotes of option chains by derive_columns
+DERIVED_COLUMNS = ('t_delta', 'mark', 'spread', 'moneyness')
+
+
+def set_verbosity(level):
+    """
+    Set the level of the messages logged by kaleidoscope, e.g. logging.INFO to log
+    orders and fills, or logging.WARNING for quiet optimization runs. Messages are
+    passed on to the handlers configured by the application.
+
+    :param level: logging level
+    :return: None
+    """
+    logger = logging.getLogger("kaleidoscope")
+    logger.setLevel(level)
+    logger.propagate = True
+
 
 def generate_symbol(sym, exp, strike, opt_type):
     """
@@ -27,3 +45,55 @@ def parse_symbol(sym):
 
     matcher = re.compile(r'^(.+)([0-9]{6})([PC])([0-9]+)$')
     return matcher.search(sym)
+
+
+def contract_quote(quotes, contract):
+    """
+    Return the quote of an option contract from the daily option chains. Option chains
+    kept apart by underlying symbol are only searched for the contract's underlying.
+
+    :param quotes: dataframe containing option chains, or dict of option chains by underlying symbol
+    :param contract: option contract to get the quote for
+    :return: dict of the contract's quote, None if the contract is not quoted
+    """
+    if isinstance(quotes, dict):
+        quotes = quotes.get(getattr(contract, 'underlying_symbol', None))
+
+        if quotes is None:
+            return None
+
+    quote = quotes[quotes['symbol'] == contract.symbol].to_dict(orient='records')
+    return quote[0] if quote else None
+
+
+def derive_columns(chains):
+    """
+    Add the columns derived from the quotes of option chains: days to expiration
+    (t_delta), mark, bid-ask spread and moneyness (strike / underlying price).
+    Date columns are converted to datetime, derived columns already present
+    are kept as they are.
+
+    :param chains: dataframe containing option chains
+    :return: dataframe with the derived columns
+    """
+    columns = dict()
+
+    for col in ('quote_date', 'expiration'):
+        if not pd.api.types.is_datetime64_any_dtype(chains[col]):
+            columns[col] = pd.to_datetime(chains[col])
+
+    if 't_delta' not in chains.columns:
+        quote_date = columns.get('quote_date', chains['quote_date'])
+        expiration = columns.get('expiration', chains['expiration'])
+        columns['t_delta'] = (expiration - quote_date).dt.days
+
+    if 'bid' in chains.columns and 'ask' in chains.columns:
+        if 'mark' not in chains.columns:
+            columns['mark'] = (chains['bid'] + chains['ask']) / 2
+        if 'spread' not in chains.columns:
+            columns['spread'] = chains['ask'] - chains['bid']
+
+    if 'moneyness' not in chains.columns and 'underlying_price' in chains.columns:
+        columns['moneyness'] = chains['strike'] / chains['underlying_price']
+
+    return chains.assign(**columns) if columns else chains
@@ -0,0 +1,177 @@
+"""
+In-memory store of option chains that keeps the static attributes of each option
+contract apart from its daily quotes.
+"""
+import numpy as np
+import pandas as pd
+
+# attributes of an option contract that do not change over its life
+CONTRACT_COLUMNS = ('symbol', 'underlying_symbol', 'root', 'expiration', 'strike', 'option_type')
+
+
+def _join(contracts, quotes, columns):
+    """
+    Join quotes with the attributes of their contracts, looked up by contract id.
+    """
+    contract_ids = quotes['contract_id'].values
+
+    data = dict()
+    for col in columns:
+        if col in contracts.columns:
+            data[col] = contracts[col].take(contract_ids).values
+        else:
+            data[col] = quotes[col].values
+
+    return pd.DataFrame(data, columns=columns)
+
+
+def to_frame(option_chains):
+    """
+    Return option chains as a dataframe, joining them if they are a ChainDay.
+
+    :param option_chains: dataframe or ChainDay
+    :return: dataframe containing the option chains
+    """
+    return option_chains.to_frame() if isinstance(option_chains, ChainDay) else option_chains
+
+
+class ChainDay(object):
+
+    __slots__ = ('contracts', 'quotes', 'columns')
+
+    def __init__(self, contracts, quotes, columns):
+        """
+        The quotes of a quote date of a chain store, kept apart from their contracts until
+        the option chains are used, so days no one queries are never joined. The contracts
+        are the ones of the store when the day was reached, before any later eviction.
+
+        :param contracts: contract table of the chain store
+        :param quotes: rows of the quote table of the quote date
+        :param columns: column order of the joined option chains
+        """
+        self.contracts = contracts
+        self.quotes = quotes
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.quotes)
+
+    def to_frame(self, columns=None):
+        """
+        Join the quotes with the attributes of their contracts.
+
+        :param columns: columns to return, if None return all columns of the option chains
+        :return: dataframe containing the option chains of the quote date
+        """
+        return _join(self.contracts, self.quotes, self.columns if columns is None else columns)
+
+
+class ChainStore(object):
+    def __init__(self, data):
+        """
+        Split option chains into a contract table with one row per option contract,
+        indexed by an integer contract id, and a narrow quote table of the daily values
+        referencing the contracts by contract_id. Quotes are ordered by quote date and
+        indexed by the row offsets of each quote date.
+
+        :param data: dataframe containing option chains, contracts are identified by symbol
+        """
+        # column order of the joined option chains
+        self.columns = list(data.columns)
+
+        contract_cols = [col for col in CONTRACT_COLUMNS if col in data.columns]
+        data = data.sort_values('quote_date', kind='mergesort')
+
+        # contract ids are assigned in order of first appearance, like the rows kept by drop_duplicates
+        contract_ids, _ = pd.factorize(data['symbol'])
+
+        self.contracts = data.loc[~data['symbol'].duplicated(), contract_cols].reset_index(drop=True)
+        self.contracts.index.name = 'contract_id'
+
+        self.quotes = data.drop(contract_cols, axis=1).reset_index(drop=True)
+        self.quotes.insert(0, 'contract_id', contract_ids.astype(np.int32))
+
+        # row offsets of each quote date, the quotes of dates[i] are offsets[i]:offsets[i + 1]
+        quote_dates = self.quotes['quote_date'].values
+        starts = np.flatnonzero(np.r_[True, quote_dates[1:] != quote_dates[:-1]]) if len(quote_dates) else []
+        self.dates = quote_dates[starts]
+        self.offsets = np.append(starts, len(quote_dates)).astype(np.int64)
+
+    def __len__(self):
+        return len(self.quotes)
+
+    def join(self, quotes, columns=None):
+        """
+        Join quotes with the attributes of their contracts.
+
+        :param quotes: rows of the quote table
+        :param columns: columns to return, if None return all columns of the option chains
+        :return: dataframe containing the option chains of the quotes
+        """
+        return _join(self.contracts, quotes, self.columns if columns is None else columns)
+
+    def to_frame(self, columns=None):
+        """
+        Return all option chains of the store.
+
+        :param columns: columns to return, if None return all columns of the option chains
+        :return: dataframe containing option chains ordered by quote date
+        """
+        return self.join(self.quotes, columns)
+
+    def _evict(self, consumed):
+        """
+        Drop the quotes of the first consumed quote dates, and the contracts without
+        quotes on the remaining quote dates, e.g. expired contracts. Contract ids are
+        renumbered in order of the remaining contracts.
+
+        :param consumed: number of quote dates to drop
+        :return: None
+        """
+        start = self.offsets[consumed]
+        quotes = self.quotes.iloc[start:]
+
+        # contracts still quoted, in contract id order
+        keep = np.unique(quotes['contract_id'].values)
+        contract_ids = np.full(len(self.contracts), -1, dtype=np.int32)
+        contract_ids[keep] = np.arange(len(keep), dtype=np.int32)
+
+        # copy the remaining rows so the memory of the dropped rows is released
+        self.contracts = self.contracts.take(keep).reset_index(drop=True)
+        self.contracts.index.name = 'contract_id'
+
+        self.quotes = quotes.reset_index(drop=True).copy()
+        self.quotes['contract_id'] = contract_ids[self.quotes['contract_id'].values]
+
+        self.dates = self.dates[consumed:]
+        self.offsets = self.offsets[consumed:] - start
+
+    def days(self, join=True, evict=False, lazy=False):
+        """
+        Iterate over the option chains of the store one quote date at a time.
+
+        :param join: join the quotes with their contracts, otherwise return the quote table rows
+        :param evict: drop the quotes of past quote dates and the contracts without further
+                      quotes from the store as the iteration advances, the store only holds
+                      the quote dates not yet iterated afterwards
+        :param lazy: return a ChainDay of the quote table rows instead of joining them, they
+                     are only joined with their contracts if the option chains are used
+        :return: generator of (quote_date, dataframe) tuples ordered by quote date
+        """
+        i = 0
+
+        while i < len(self.dates):
+            quotes = self.quotes.iloc[self.offsets[i]:self.offsets[i + 1]]
+
+            if lazy:
+                yield self.dates[i], ChainDay(self.contracts, quotes, self.columns)
+            else:
+                yield self.dates[i], self.join(quotes) if join else quotes
+
+            i += 1
+
+            # evict once the past quotes outnumber the remaining ones, so each row is copied
+            # a bounded number of times and the store holds at most twice the remaining rows
+            if evict and self.offsets[i] * 2 >= len(self.quotes):
+                self._evict(i)
+                i = 0
@@ -1,26 +1,195 @@
+import heapq
+import itertools
+import operator
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
 from kaleidoscope.event import DataEvent
-from kaleidoscope.options.option_query import OptionQuery
+from kaleidoscope.options.chain_store import ChainStore, to_frame
+
+
+def iter_days(data):
+    """
+    Split option chains into daily option chains.
+
+    :param data: A DataFrame containing option chains
+    :return: generator of (quote_date, dataframe) tuples ordered by quote date
+    """
+    for quote_date, option_chains in data.groupby('quote_date', sort=True):
+        yield quote_date, option_chains
+
+
+def merge_days(streams):
+    """
+    Merge streams of daily option chains into a single stream ordered by quote date.
+    Option chains of streams sharing a quote date are combined into one dataframe,
+    or if the streams are given as a dict by symbol, into a dict of the option chains
+    of each symbol quoted on the quote date.
+
+    The streams are merged lazily with a heap holding the next quote date of each
+    stream, so each stream is only read as far as the current quote date.
+
+    Quote dates are converted to timestamps, so streams of data feeds yielding quote
+    dates as strings or datetimes can be merged.
+
+    :param streams: iterables of (quote_date, dataframe) tuples, each ordered by quote date,
+                    or a dict of such iterables by symbol
+    :return: generator of (quote_date, dataframe) or (quote_date, dict) tuples ordered by quote date
+    """
+    keyed = isinstance(streams, dict)
+    symbols = list(streams) if keyed else itertools.repeat(None)
+    streams = streams.values() if keyed else streams
+
+    def tag(symbol, stream):
+        for quote_date, option_chains in stream:
+            yield pd.Timestamp(quote_date), symbol, option_chains
+
+    streams = [tag(symbol, stream) for symbol, stream in zip(symbols, streams)]
+    merged = heapq.merge(*streams, key=operator.itemgetter(0))
+
+    for quote_date, days in itertools.groupby(merged, key=operator.itemgetter(0)):
+        if keyed:
+            yield quote_date, {symbol: option_chains for _, symbol, option_chains in days}
+            continue
+
+        option_chains = [day[2] for day in days]
+
+        if len(option_chains) == 1:
+            yield quote_date, option_chains[0]
+        else:
+            yield quote_date, pd.concat([to_frame(chains) for chains in option_chains], ignore_index=True)
+
+
+# marks the end of the items of a prefetch iterator
+_END = object()
+
+
+class PrefetchIterator(object):
+    def __init__(self, iterable, size=1):
+        """
+        Iterate over the items of an iterable prepared ahead in a background thread,
+        e.g. the data events of the next quote dates while the current one is processed.
+        Items are produced in order, so the iteration yields the same items as the iterable.
+
+        :param iterable: iterable to prefetch the items of
+        :param size: max number of items prepared ahead
+        """
+        if size < 1:
+            raise ValueError("Prefetch size must be at least 1")
+
+        self._queue = queue.Queue(maxsize=size)
+        self._closed = threading.Event()
+        self._done = False
+
+        self._thread = threading.Thread(target=self._fill, args=(iter(iterable),), daemon=True)
+        self._thread.start()
+
+    def _put(self, item, err=None):
+        """
+        Wait for room in the buffer to add an item, unless the iterator is closed.
+
+        :return: True if the item was added
+        """
+        while not self._closed.is_set():
+            try:
+                self._queue.put((item, err), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def _fill(self, items):
+        try:
+            for item in items:
+                if not self._put(item):
+                    return
+        except Exception as err:
+            # raised in the consuming thread when it reaches the failed item
+            self._put(None, err)
+            return
+
+        self._put(_END)
+
+    def close(self):
+        """
+        Stop preparing items, the background thread ends after its current item.
+        """
+        self._closed.set()
+        self._done = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+
+        item, err = self._queue.get()
+
+        if err is not None:
+            self._done = True
+            raise err
+        elif item is _END:
+            self._done = True
+            raise StopIteration
+
+        return item
 
 
 class OptionChainIterator(object):
-    def __init__(self, data):
+    def __init__(self, data, evict=False):
+        """
+        Iterate over option chains one quote date at a time.
+
+        :param data: A DataFrame or ChainStore containing option chains, or an iterable
+                     of (quote_date, dataframe) tuples ordered by quote date, the dataframe
+                     can be a dict of the option chains of each underlying symbol
+        :param evict: drop the option chains of past quote dates and expired contracts
+                      as the iteration advances, see ChainStore.days
+        """
+        if evict and isinstance(data, pd.DataFrame):
+            # only a chain store can release the rows of past quote dates
+            data = ChainStore(data)
+
+        if isinstance(data, pd.DataFrame):
+            self.data = data
+            self.days = self._days(data)
+        elif isinstance(data, ChainStore):
+            # contracts are joined with the quotes of a quote date when its option chains are used
+            self.data = data
+            self.days = data.days(evict=evict, lazy=True)
+        else:
+            # option chains are already streamed by quote date
+            self.data = None
+            self.days = iter(data)
+
+    @staticmethod
+    def _days(df):
+        """
+        Sort the option chains by quote date once and yield the rows of each quote date
+        as a contiguous slice, using the row offsets where the quote date changes.
+        """
+        df = df.sort_values('quote_date', kind='mergesort')
+        quote_dates = df['quote_date'].values
+
+        starts = np.flatnonzero(np.r_[True, quote_dates[1:] != quote_dates[:-1]]) if len(df) else []
+        ends = np.append(starts[1:], len(df)).astype(np.int64)
 
-        self.data = data
-        # get all quote dates that can be iterated
-        self.dates = sorted(data['quote_date'].unique())
-        # turn list of dates into an iterable
-        self.dates = iter(self.dates)
+        for start, end in zip(starts, ends):
+            yield df['quote_date'].iat[start], df.iloc[start:end]
 
     def __iter__(self):
         return self
 
     def __next__(self):
         try:
-            df = self.data
-            quote_date = next(self.dates)
-            # return a data event containing the daily quote for option chains
-            option_chains = df.loc[df['quote_date'] == quote_date]
-            # create the data event and return it
-            return DataEvent(quote_date, OptionQuery(option_chains))
+            quote_date, option_chains = next(self.days)
+            # create the data event containing the daily quote for option chains and return it,
+            # its OptionQuery is built when the strategy first queries the option chains
+            return DataEvent(quote_date, option_chains)
         except StopIteration:
             raise
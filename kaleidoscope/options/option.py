@@ -30,7 +30,7 @@ class Option(object):
         :param quote: Dict containing option attributes from dataframe
         :return:
         """
-        if 'bid' in quote and 'ask' in quote:
+        if 'mark' not in quote and 'bid' in quote and 'ask' in quote:
             quote['mark'] = (quote['bid'] + quote['ask']) / 2
 
         self.__dict__.update(quote)
@@ -8,6 +8,7 @@ import operator
 import pandas as pd
 
 from kaleidoscope.globals import Period, OptionType
+from kaleidoscope.helpers import derive_columns
 
 
 class OptionQuery(object):
@@ -19,22 +20,58 @@ class OptionQuery(object):
     """
 
     def __init__(self, option_chain, inplace=False):
-        # Create a copy of the option chain dataframe to prevent modifying
-        # the original dataframe and to able to reuse it for other queries
-        self.option_chain = option_chain.copy() if not inplace else option_chain
-        self.option_chain.reset_index(drop=True, inplace=True)
-
-        # create t_delta column if not present
-        if 't_delta' not in self.option_chain.columns:
-            # convert date columns to pandas datetime
-            self.option_chain.loc[:, 'quote_date'] = pd.to_datetime(self.option_chain['quote_date'])
-            self.option_chain.loc[:, 'expiration'] = pd.to_datetime(self.option_chain['expiration'])
-
-            # calculate the difference between expiration date and quote date
-            t_delta = self.option_chain['expiration'] - self.option_chain['quote_date']
-            self.option_chain['t_delta'] = t_delta.dt.days
-
-            # QUERY METHODS =================================================================================
+        # the option chain is prepared when first queried, so an unused query costs nothing
+        self._source = option_chain
+        self._inplace = inplace
+        self._option_chain = None
+
+        # option chains kept apart by underlying symbol, and the queries of each symbol
+        self._chains = option_chain if isinstance(option_chain, dict) else None
+        self._symbols = dict()
+
+    @property
+    def option_chain(self):
+        if self._option_chain is None:
+            if self._chains is not None:
+                # combining the option chains of the symbols creates a new dataframe
+                option_chain = pd.concat(list(self._chains.values()), ignore_index=True)
+            else:
+                # Create a copy of the option chain dataframe to prevent modifying
+                # the original dataframe and to able to reuse it for other queries
+                option_chain = self._source.copy() if not self._inplace else self._source
+                option_chain.reset_index(drop=True, inplace=True)
+
+            # data feeds add the derived columns when loading option chains,
+            # only compute them for option chains from other sources
+            if 't_delta' not in option_chain.columns:
+                option_chain = derive_columns(option_chain)
+
+            self._option_chain = option_chain
+            self._source = None
+
+        return self._option_chain
+
+    def __getitem__(self, symbol):
+        """
+        Return the option chains of an underlying symbol, e.g. data['SPY']. Option chains
+        kept apart by symbol are returned without filtering the option chains of the
+        other symbols.
+
+        :param symbol: underlying symbol to return the option chains for
+        :return: OptionQuery of the symbol's option chains, empty if the symbol has no quotes
+        """
+        if symbol not in self._symbols:
+            if self._chains is None:
+                chain = self.option_chain
+                chain = chain[chain['underlying_symbol'] == symbol]
+            elif symbol in self._chains:
+                chain = self._chains[symbol]
+            else:
+                chain = next(iter(self._chains.values())).iloc[0:0]
+
+            self._symbols[symbol] = OptionQuery(chain)
+
+        return self._symbols[symbol]
 
     def puts(self):
         """
@@ -239,12 +276,6 @@ class OptionQuery(object):
 
         return lookup_col, val
 
-    def _strip(self):
-        """
-        Remove unnecessary columns, used for final output of fetch functions
-        """
-        return self.option_chain.drop(['t_delta'], axis=1)
-
     def _compare(self, column, op, val):
         """
         Compares the column value to the val param using the operator passed in op param
@@ -280,6 +311,8 @@ class OptionQuery(object):
 
     def fetch(self):
         """
-        Return all rows of this object's option chain
+        Return a copy of all rows of this object's option chain, including the derived columns.
+        The quotes of a data event are shared by its queries, so changes to the result
+        do not affect them.
         """
-        return self._strip()
+        return self.option_chain.copy()
@@ -24,8 +24,7 @@ class OptionStrategies(object):
         chains = chains.lte('expiration', params['DTE']).fetch() if 'DTE' in params else chains.fetch()
         original_chains = chains
 
-        chains['symbol'] = '.' + chains['symbol']
-        chains['mark'] = (chains['bid'] + chains['ask']) / 2
+        chains['symbol'] = '.' + chains['symbol'].astype(str)
         chains['volume'] = chains['trade_volume']
 
         new_col = ['symbol', 'underlying_symbol', 'quote_date', 'expiration', 'volume', 'mark']
@@ -69,7 +68,7 @@ class OptionStrategies(object):
 
         chains = chains.merge(chains, left_on=left_keys, right_on=right_keys, suffixes=('', '_shifted'))
 
-        chains['symbol'] = '.' + chains['symbol'] + '-.' + chains['symbol_shifted']
+        chains['symbol'] = '.' + chains['symbol'].astype(str) + '-.' + chains['symbol_shifted'].astype(str)
         chains['mark'] = ((chains['bid'] - chains['ask_shifted']) + (chains['ask'] - chains['bid_shifted'])) / 2
         chains['volume'] = chains['trade_volume'] + chains['trade_volume_shifted']
 
@@ -122,7 +121,7 @@ class OptionStrategies(object):
         # CALL SIDE ===================================================================================================
         call_side = call_chains.merge(call_chains, left_on=left_keys, right_on=right_keys, suffixes=('', '_shifted'))
 
-        call_side['symbol'] = '.' + call_side['symbol'] + '-.' + call_side['symbol_shifted']
+        call_side['symbol'] = '.' + call_side['symbol'].astype(str) + '-.' + call_side['symbol_shifted'].astype(str)
         call_side['mark'] = ((call_side['bid'] - call_side['ask_shifted']) +
                              (call_side['ask'] - call_side['bid_shifted'])) / 2
         call_side['volume'] = call_side['trade_volume'] + call_side['trade_volume_shifted']
@@ -130,7 +129,7 @@ class OptionStrategies(object):
         # PUT SIDE ====================================================================================================
         put_side = put_chains.merge(put_chains, left_on=left_keys, right_on=right_keys, suffixes=('', '_shifted'))
 
-        put_side['symbol'] = '.' + put_side['symbol'] + '-.' + put_side['symbol_shifted']
+        put_side['symbol'] = '.' + put_side['symbol'].astype(str) + '-.' + put_side['symbol_shifted'].astype(str)
         put_side['mark'] = ((put_side['bid'] - put_side['ask_shifted']) +
                             (put_side['ask'] - put_side['bid_shifted'])) / 2
         put_side['volume'] = put_side['trade_volume'] + put_side['trade_volume_shifted']
@@ -182,10 +181,11 @@ class OptionStrategies(object):
 
         side = -1 * params['option_type'].value[1]
 
-        chains['spread_mark'] = (side * (chains['bid'] + chains['ask']) / 2) + chains['underlying_price']
+        chains['spread_mark'] = (side * chains['mark']) + chains['underlying_price']
 
         prefix = "-." if params['option_type'] == OptionType.CALL else "."
-        chains['spread_symbol'] = prefix + chains['symbol'] + "+100*" + chains['underlying_symbol']
+        chains['spread_symbol'] = (prefix + chains['symbol'].astype(str) +
+                                   "+100*" + chains['underlying_symbol'].astype(str))
 
         return chains[out_col + ['strike']]
 
@@ -250,7 +250,7 @@ class OptionStrategies(object):
                     chains['spread_' + c] = f(chains[c], chains[c + '_shifted'])
 
         chains['spread_mark'] = (chains['spread_bid'] + chains['spread_ask']) / 2
-        chains['spread_symbol'] = "." + chains['symbol_shifted'] + "-." + chains['symbol']
+        chains['spread_symbol'] = "." + chains['symbol_shifted'].astype(str) + "-." + chains['symbol'].astype(str)
 
         # assign the strategy name to this dataframe's name attribute
         chains.name = OptionStrategies.single.__name__
@@ -1,3 +1,4 @@
+from kaleidoscope.helpers import contract_quote
 from kaleidoscope.options.option_strategy import OptionStrategy
 
 
@@ -37,14 +38,26 @@ class Order(object):
         """
         Update the order's symbols with current market values
 
-        :params quotes: DataFrame of updated option symbols from broker
+        :params quotes: DataFrame of updated option symbols from broker, or dict of them by underlying symbol
+        :return: False if a leg has no quote today, the order then keeps its last values
+                 and must not be executed against them
         """
+        leg_quotes = list()
+
         for leg in self.order_strat.legs:
-            quote = quotes[quotes['symbol'] == leg['contract'].symbol].to_dict(orient='records')[0]
+            quote = contract_quote(quotes, leg['contract'])
+
+            if quote is None:
+                return False
+
+            leg_quotes.append(quote)
+
+        for leg, quote in zip(self.order_strat.legs, leg_quotes):
             leg['contract'].update(quote)
 
         # update the mark value of the order
         self.mark = self.order_strat.calc_mark()
+        return True
 
     def __str__(self):
         if self.executed_price == 0 and self.limit_price is None:
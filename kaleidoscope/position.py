@@ -1,3 +1,6 @@
+from kaleidoscope.helpers import contract_quote
+
+
 class Position(object):
     def __init__(self, contract, quantity):
         """
@@ -13,7 +16,7 @@ class Position(object):
         self.contract = contract
 
         # set initial values
-        self.trade_price = (self.contract.bid + self.contract.ask) / 2
+        self.trade_price = self.contract.mark
         self.open_pl = 0
 
         self.mark = self.trade_price
@@ -23,16 +26,23 @@ class Position(object):
         """
         Update this position's current market values
 
-        :param quotes: Dataframe containing the latest market info for the position's symbol
+        :param quotes: Dataframe containing the latest market info for the position's symbol,
+                       or dict of dataframes by underlying symbol
         :return: None
         """
         # TODO: account for stock legs for covered stocks
         # filter the quotes for this position's symbol and get the dict with all the attributes
-        quote = quotes[quotes['symbol'] == self.contract.symbol].to_dict(orient='records')[0]
+        quote = contract_quote(quotes, self.contract)
+
+        if quote is None:
+            # no quote for the contract today, e.g. it moved outside of the strategy's
+            # subscription requirements, keep the last known values
+            return
+
         self.contract.update(quote)
 
         # update mark value
-        self.mark = (self.contract.bid + self.contract.ask) / 2
+        self.mark = self.contract.mark
         self.net_liquidating_value = self.mark * self.quantity * 100
         self.open_pl = (self.mark - self.trade_price) * self.quantity * 100
 
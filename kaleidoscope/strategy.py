@@ -1,7 +1,10 @@
 import datetime
 
+import pandas as pd
+
+from kaleidoscope.datafeeds.requirements import Requirements
 from kaleidoscope.event import OrderEvent
-from kaleidoscope.globals import OrderAction, OrderType, OrderTIF
+from kaleidoscope.globals import OptionType, OrderAction, OrderType, OrderTIF
 from kaleidoscope.options.option_strategy import OptionStrategy
 from kaleidoscope.order import Order
 from kaleidoscope.sizers import fixed_quantity_sizer
@@ -26,6 +29,9 @@ class Strategy(object):
         self.start_date = None
         self.end_date = None
 
+        # quote dates to call on_data for, None calls it for every quote date
+        self.schedule = None
+
         if 'sizer' not in params:
             self.sizer = fixed_quantity_sizer
 
@@ -45,16 +51,34 @@ class Strategy(object):
         """
         self.broker.set_account_balance(amt)
 
-    def add_option(self, symbol, exclude_splits=True, option_type=None):
+    def add_option(self, symbol, exclude_splits=True, option_type=None,
+                   dte=None, moneyness=None, delta=None):
         """
-        Pass the parameters and option strategy to create to the broker
+        Subscribe to the option chains of a symbol. The broker loads all symbols
+        subscribed during on_init together when the backtest starts.
+
+        Option contracts the strategy will never trade can be excluded with the dte,
+        moneyness and delta requirements, they are not read from the data source.
+        Positions in contracts that move outside of the requirements keep their last
+        known prices, so bands should also cover the contracts that are held.
 
         :param symbol: symbol to add option for
         :param exclude_splits: exclude options created from the underlying's stock splits
         :param option_type: If None, or not passed in, will retrieve both calls and puts of option chain
+        :param dte: (min, max) days to expiration of the contracts to retrieve, bounds can be Periods
+        :param moneyness: (min, max) strike / underlying price of the contracts to retrieve
+        :param delta: (min, max) absolute delta of the contracts to retrieve
         :return: None
         """
-        self.broker.source(symbol, self.start_date, self.end_date, exclude_splits, option_type)
+        if isinstance(option_type, OptionType):
+            option_type = option_type.value[0]
+
+        requirements = None
+
+        if dte is not None or moneyness is not None or delta is not None:
+            requirements = Requirements(dte, moneyness, delta)
+
+        self.broker.source(symbol, self.start_date, self.end_date, exclude_splits, option_type, requirements)
 
     def set_start_date(self, year, month, day):
         """
@@ -79,6 +103,37 @@ class Strategy(object):
 
         self.end_date = datetime.date(year=year, month=month, day=day).strftime("%Y-%m-%d")
 
+    def set_schedule(self, weekdays=None, rule=None):
+        """
+        Only call on_data on the quote dates of a schedule, e.g. on Fridays. Positions
+        and working orders are still updated by the broker on every quote date.
+
+        :param weekdays: weekdays to trade on, 0 for Monday to 4 for Friday
+        :param rule: callable receiving the quote date, returns True to trade on the quote date
+        :return: None
+        """
+        weekdays = None if weekdays is None else frozenset(weekdays)
+
+        if weekdays is None and rule is None:
+            self.schedule = None
+            return
+
+        def schedule(quote_date):
+            if weekdays is not None and quote_date.weekday() not in weekdays:
+                return False
+            return rule is None or rule(quote_date)
+
+        self.schedule = schedule
+
+    def scheduled(self, quote_date):
+        """
+        Check if on_data is called on a quote date.
+
+        :param quote_date: quote date to check
+        :return: Boolean
+        """
+        return self.schedule is None or self.schedule(pd.Timestamp(quote_date))
+
     def _init(self, **params):
         """
         Perform any strategy class specific initialization logic here, then
@@ -105,7 +160,10 @@ class Strategy(object):
         :return: None
         """
         self.current_date = event.date
-        self.on_data(event.quotes)
+
+        # the option chains of quote dates outside of the schedule are never queried
+        if self.scheduled(event.date):
+            self.on_data(event.quotes)
 
     def on_data(self, data):
         raise NotImplementedError
@@ -1,5 +1,10 @@
+import logging
+
 import kaleidoscope as kd
 
+# print the orders and fills of the backtest
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
 
 class SampleStrategy(kd.Strategy):
     """
@@ -13,8 +18,9 @@ class SampleStrategy(kd.Strategy):
         self.set_start_date(2016, 2, 19)
         self.set_end_date(2016, 2, 19)
 
-        # Subscribe to the options data specified from params
-        self.add_option(self.symbol)
+        # Subscribe to the options data specified from params, only
+        # contracts up to the DTE we trade are loaded
+        self.add_option(self.symbol, dte=(0, self.DTE))
 
     def on_data(self, data):
         """
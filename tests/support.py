@@ -0,0 +1,84 @@
+"""
+Helpers to build small option chain data sources for tests.
+"""
+import datetime
+import sqlite3
+
+import pandas as pd
+
+# column layout of the option chain tables read by SQLiteDataFeed
+OPTION_CHAIN_COLUMNS = (
+    'symbol', 'underlying_symbol', 'quote_date', 'root', 'expiration', 'strike',
+    'option_type', 'open', 'high', 'low', 'close', 'trade_volume', 'bid_size',
+    'bid', 'ask_size', 'ask', 'underlying_price', 'iv', 'delta', 'gamma',
+    'theta', 'vega', 'rho', 'open_interest'
+)
+
+
+def option_chain_rows(underlying, dates, expirations, strikes, root=None, price=20.0):
+    """
+    Generate option chain rows in the OPTION_CHAIN_COLUMNS layout.
+
+    :param underlying: underlying symbol of the option chain
+    :param dates: quote dates as 'YYYY-MM-DD' strings
+    :param expirations: expiration dates as 'YYYY-MM-DD' strings
+    :param strikes: strikes to generate calls and puts for
+    :param root: option root, defaults to the underlying symbol
+    :param price: underlying price on the first quote date
+    :return: list of row tuples
+    """
+    root = underlying if root is None else root
+    rows = list()
+
+    for day, quote_date in enumerate(dates):
+        underlying_price = price + day * 0.5
+        for expiration in expirations:
+            if expiration < quote_date:
+                continue
+
+            exp = datetime.datetime.strptime(expiration, "%Y-%m-%d")
+            for strike in strikes:
+                for option_type in ('c', 'p'):
+                    intrinsic = max((underlying_price - strike) * (1 if option_type == 'c' else -1), 0)
+                    bid = round(intrinsic + 0.5, 2)
+                    symbol = "%s%s%s%08d" % (root, exp.strftime("%y%m%d"),
+                                             option_type.upper(), int(strike * 1000))
+                    delta = 0.5 if option_type == 'c' else -0.5
+                    rows.append((symbol, underlying, quote_date, root, expiration, float(strike),
+                                 option_type, None, None, None, None, 10, 5, bid, 5, bid + 0.2,
+                                 underlying_price, 0.3, delta, 0.1, -0.05, 0.2, 0.01, 100))
+
+    return rows
+
+
+def option_quote(underlying, quote_date='2016-02-16'):
+    """
+    Generate the option chain of a single call quote, for fake data feeds that only
+    need the columns used to build chain stores and data events.
+
+    :param underlying: underlying symbol of the option chain
+    :param quote_date: quote date as a 'YYYY-MM-DD' string
+    :return: dataframe with one row
+    """
+    return pd.DataFrame({'symbol': [underlying + "160219C00020000"], 'underlying_symbol': [underlying],
+                         'quote_date': [quote_date], 'expiration': ['2016-02-19'],
+                         'bid': [1.0], 'ask': [1.2]})
+
+
+def create_option_db(path, symbol, rows):
+    """
+    Create a sqlite option chain table for symbol and fill it with rows.
+
+    :param path: path of the sqlite database file
+    :param symbol: symbol to create the option chain table for
+    :param rows: rows in the OPTION_CHAIN_COLUMNS layout
+    :return: None
+    """
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE %s_option_chain (%s)" % (symbol, ", ".join(OPTION_CHAIN_COLUMNS)))
+        conn.executemany("INSERT INTO %s_option_chain VALUES (%s)" %
+                         (symbol, ", ".join("?" * len(OPTION_CHAIN_COLUMNS))), rows)
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+
+from kaleidoscope.datafeeds.csv_data import CSVDataFeed
+from kaleidoscope.helpers import DERIVED_COLUMNS
+from tests.support import OPTION_CHAIN_COLUMNS, option_chain_rows
+
+DATES = ['2016-02-16', '2016-02-17', '2016-02-18', '2016-02-19']
+EXPIRATIONS = ['2016-02-19', '2016-02-26']
+
+
+class TestCSVDataFeed(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        rows = option_chain_rows("VXX", DATES, EXPIRATIONS, [19, 20, 21])
+        rows += option_chain_rows("VXX", DATES, EXPIRATIONS, [20], root="VXX1")
+        rows += option_chain_rows("SPY", DATES, EXPIRATIONS, [200])
+
+        data = pd.DataFrame(rows, columns=OPTION_CHAIN_COLUMNS)
+        # vendor files carry columns that are not used
+        data['exchange'] = "CBOE"
+
+        for quote_date, day in data.groupby('quote_date'):
+            day.to_csv(os.path.join(self.tmp_dir.name, "options_%s.csv" % quote_date.replace("-", "")), index=False)
+
+        self.feed = CSVDataFeed(self.tmp_dir.name, chunksize=7)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get(self):
+        data = self.feed.get("VXX", start='2016-02-17', option_type='c')
+        mapped = [col[0] for col in self.feed.opt_params if col[1] != -1]
+
+        self.assertEqual(mapped + list(DERIVED_COLUMNS), list(data.columns))
+        self.assertEqual(DATES[1:], sorted(data['quote_date'].dt.strftime('%Y-%m-%d').unique()))
+        self.assertEqual(['VXX'], list(data['root'].unique()))
+        self.assertEqual(['c'], list(data['option_type'].unique()))
+        self.assertEqual('float64', str(data['bid'].dtype))
+
+    def test_get_no_files_in_range(self):
+        expected = self.feed.get("VXX").iloc[0:0]
+        data = CSVDataFeed(self.tmp_dir.name, compact=True).get("VXX", start='2017-01-01')
+
+        self.assertTrue(data.empty)
+        self.assertEqual(list(expected.columns), list(data.columns))
+        self.assertEqual('datetime64[ns]', str(data['quote_date'].dtype))
+        self.assertEqual('float32', str(data['bid'].dtype))
+
+    def test_files_outside_date_range_are_skipped(self):
+        files = self.feed._files(start='2016-02-17', end='2016-02-18')
+        self.assertEqual(["options_20160217.csv", "options_20160218.csv"], [os.path.basename(f) for f in files])
+
+    def test_partitions(self):
+        rows = option_chain_rows("VXX", ['2016-03-01'], ['2016-03-18'], [20])
+        pd.DataFrame(rows, columns=OPTION_CHAIN_COLUMNS).to_csv(
+            os.path.join(self.tmp_dir.name, "options_20160301.csv"), index=False)
+
+        self.assertEqual([('2016-02-17', '2016-02-29'), ('2016-03-01', '2016-03-31')],
+                         self.feed.partitions("VXX", start='2016-02-17'))
+        self.assertEqual(['2016-03-01'], list(self.feed.get("VXX", '2016-03-01', '2016-03-31')
+                                              ['quote_date'].dt.strftime('%Y-%m-%d').unique()))
+
+    def test_partitions_without_file_dates(self):
+        os.rename(os.path.join(self.tmp_dir.name, "options_20160216.csv"),
+                  os.path.join(self.tmp_dir.name, "options.csv"))
+        self.assertRaises(ValueError, self.feed.partitions, "VXX")
+
+    def test_stream(self):
+        days = list(self.feed.stream("VXX", exclude_splits=False))
+
+        self.assertEqual(DATES, [day[0] for day in days])
+        for quote_date, option_chains in days:
+            self.assertTrue((option_chains['quote_date'] == quote_date).all())
+            self.assertEqual(len(EXPIRATIONS) * 4 * 2, len(option_chains))
+
+    def test_get_missing_path(self):
+        feed = CSVDataFeed(os.path.join(self.tmp_dir.name, "missing"))
+        self.assertRaises(IOError, feed.get, "VXX")
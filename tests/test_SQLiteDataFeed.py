@@ -1,6 +1,158 @@
+import concurrent.futures
+import os
+import sqlite3
+import tempfile
 from unittest import TestCase
 
+import pandas as pd
+
+from kaleidoscope.datafeeds.sqlite_data import SQLiteDataFeed
+from kaleidoscope.helpers import DERIVED_COLUMNS
+from tests.support import create_option_db, option_chain_rows
+
+DATES = ['2016-02-16', '2016-02-17', '2016-02-18', '2016-02-19']
+EXPIRATIONS = ['2016-02-19', '2016-02-26']
+
 
 class TestSQLiteDataFeed(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "securities.db")
+
+        rows = option_chain_rows("VXX", DATES, EXPIRATIONS, [19, 20, 21])
+        # options created from a stock split carry a different root
+        rows += option_chain_rows("VXX", DATES, EXPIRATIONS, [20], root="VXX1")
+        create_option_db(self.path, "VXX", rows)
+        create_option_db(self.path, "SPY", option_chain_rows("SPY", DATES, EXPIRATIONS, [200]))
+
+        self.feed = SQLiteDataFeed(self.path)
+
+    def tearDown(self):
+        self.feed.close()
+        self.tmp_dir.cleanup()
+
     def test_get(self):
         self.fail()
+
+    def test_get_selects_mapped_columns(self):
+        data = self.feed.get("VXX")
+        mapped = [col[0] for col in self.feed.opt_params if col[1] != -1]
+
+        self.assertEqual(mapped + list(DERIVED_COLUMNS), list(data.columns))
+        self.assertTrue((data['root'] == "VXX").all())
+        self.assertEqual(len(DATES) * len(EXPIRATIONS) * 3 * 2, len(data))
+
+    def test_get_derived_columns(self):
+        data = self.feed.get("VXX")
+
+        self.assertEqual('datetime64[ns]', str(data['expiration'].dtype))
+        self.assertTrue(((data['expiration'] - data['quote_date']).dt.days == data['t_delta']).all())
+        self.assertTrue(((data['bid'] + data['ask']) / 2 == data['mark']).all())
+        self.assertTrue((data['ask'] - data['bid'] == data['spread']).all())
+        self.assertTrue((data['strike'] / data['underlying_price'] == data['moneyness']).all())
+
+    def test_partitions(self):
+        self.assertEqual([('2016-02-01', '2016-02-29')], self.feed.partitions("VXX"))
+        self.assertEqual([('2016-02-17', '2016-02-18')], self.feed.partitions("VXX", '2016-02-17', '2016-02-18'))
+        self.assertEqual([], self.feed.partitions("VXX", '2016-03-01'))
+
+    def test_get_clean(self):
+        rows = [list(row) for row in option_chain_rows("QQQ", DATES[:2], EXPIRATIONS, [100])]
+        rows[0][13], rows[0][15] = 1.5, 1.0     # crossed market
+        rows[1][13] = 0.0                       # zero bid
+        rows[2][13], rows[2][15] = -1.0, -0.5   # negative mark
+        rows.append(rows[3])                    # duplicate row
+        create_option_db(self.path, "QQQ", rows)
+
+        feed = SQLiteDataFeed(self.path, clean=True)
+        data = feed.get("QQQ")
+        report = feed.quality_report()
+        feed.close()
+
+        self.assertEqual(len(rows) - 4, len(data))
+        self.assertTrue((data['bid'] > 0).all() and (data['bid'] <= data['ask']).all())
+        self.assertFalse(data.duplicated(['symbol', 'quote_date']).any())
+
+        self.assertEqual(pd.to_datetime(DATES[:2]).tolist(), report['quote_date'].tolist())
+        self.assertEqual([1, 1, 1, 1, 4], report.iloc[0][['duplicates', 'crossed', 'zero_bid',
+                                                          'negative_mark', 'dropped']].tolist())
+        self.assertEqual(0, report.iloc[1]['dropped'])
+        self.assertTrue(report.equals(feed._quality(data)))
+
+    def test_get_quote_date_range(self):
+        data = self.feed.get("VXX", start='2016-02-17', end='2016-02-18')
+        self.assertEqual(['2016-02-17', '2016-02-18'], sorted(data['quote_date'].dt.strftime('%Y-%m-%d').unique()))
+
+        data = self.feed.get("VXX", start='2016-02-19')
+        self.assertEqual(['2016-02-19'], list(data['quote_date'].dt.strftime('%Y-%m-%d').unique()))
+
+    def test_get_filters(self):
+        data = self.feed.get("VXX", exclude_splits=False, option_type='p')
+        self.assertEqual(['p'], list(data['option_type'].unique()))
+        self.assertIn("VXX1160219P00020000", set(data['symbol']))
+
+    def test_get_invalid_symbol(self):
+        self.assertRaises(ValueError, self.feed.get, "VXX; DROP TABLE VXX_option_chain")
+
+    def test_get_missing_table(self):
+        self.assertRaises(IOError, self.feed.get, "QQQ")
+
+    def test_stream_per_day(self):
+        days = list(self.feed.stream("VXX", start='2016-02-17'))
+
+        self.assertEqual(DATES[1:], [day[0] for day in days])
+        for quote_date, option_chains in days:
+            self.assertTrue((option_chains['quote_date'] == quote_date).all())
+            self.assertEqual(len(EXPIRATIONS) * 3 * 2, len(option_chains))
+
+    def test_stream_chunked(self):
+        # chunks smaller than a day and not aligned with quote dates
+        self.feed.chunksize = 5
+        days = list(self.feed.stream("VXX"))
+
+        self.assertEqual(DATES, [day[0] for day in days])
+        self.assertEqual(len(self.feed.get("VXX")), sum(len(day[1]) for day in days))
+
+    def test_get_compact(self):
+        expected = self.feed.get("VXX")
+
+        feed = SQLiteDataFeed(self.path, compact=True)
+        data = feed.get("VXX")
+
+        self.assertEqual('category', str(data['symbol'].dtype))
+        self.assertEqual('float32', str(data['bid'].dtype))
+        self.assertEqual('float64', str(data['strike'].dtype))
+        self.assertEqual('int32', str(data['trade_volume'].dtype))
+        self.assertEqual('datetime64[ns]', str(data['quote_date'].dtype))
+        self.assertGreater(feed.bytes_saved, 0)
+        self.assertLess(data.memory_usage(deep=True).sum(), expected.memory_usage(deep=True).sum())
+
+    def test_bytes_saved_by_concurrent_gets(self):
+        feed = SQLiteDataFeed(self.path, compact=True)
+        feed.get("VXX")
+        saved = feed.bytes_saved
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: feed.get("VXX"), range(8)))
+        feed.close()
+
+        self.assertEqual(9 * saved, feed.bytes_saved)
+
+    def test_get_many(self):
+        chains = self.feed.get_many(["VXX", "SPY"], start='2016-02-18', option_type='c')
+
+        self.assertEqual(["VXX", "SPY"], list(chains))
+        for symbol in ("VXX", "SPY"):
+            expected = self.feed.get(symbol, start='2016-02-18', option_type='c')
+            self.assertTrue(expected.equals(chains[symbol]))
+
+    def test_connection_is_reused_and_read_only(self):
+        data_conn = self.feed._connection()
+        self.feed.get("VXX")
+
+        self.assertIs(data_conn, self.feed._connection())
+        self.assertRaises(sqlite3.OperationalError, data_conn.execute, "DELETE FROM VXX_option_chain")
+
+    def test_get_missing_database(self):
+        feed = SQLiteDataFeed(os.path.join(self.tmp_dir.name, "missing.db"))
+        self.assertRaises(IOError, feed.get, "VXX")
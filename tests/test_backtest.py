@@ -0,0 +1,68 @@
+import logging
+import os
+import tempfile
+from unittest import TestCase
+
+from kaleidoscope.backtest import Backtest
+from kaleidoscope.datafeeds.sqlite_data import SQLiteDataFeed
+from kaleidoscope.strategy import Strategy
+from tests.support import create_option_db, option_chain_rows
+
+DATES = ['2016-02-16', '2016-02-17', '2016-02-18', '2016-02-19']
+EXPIRATIONS = ['2016-02-19', '2016-03-18', '2016-04-15']
+
+
+class ExpirationStrategy(Strategy):
+    """
+    Records the expirations of the option chains it receives in each scenario.
+    """
+    expirations = dict()
+
+    def on_init(self, **params):
+        self.set_start_date(2016, 2, 16)
+        self.set_end_date(2016, 2, 19)
+        self.add_option("VXX", dte=self.DTE)
+
+    def on_data(self, data):
+        expirations = self.expirations.setdefault(self.DTE, set())
+        expirations.update(data.option_chain['expiration'].dt.strftime("%Y-%m-%d"))
+
+
+class TestBacktest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "securities.db")
+        create_option_db(self.path, "VXX", option_chain_rows("VXX", DATES, EXPIRATIONS, [20]))
+        ExpirationStrategy.expirations.clear()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_sweep_reloads_changed_requirements(self):
+        bt = Backtest(data=SQLiteDataFeed(self.path))
+        bt.add_opt_strategy(ExpirationStrategy, DTE=((0, 40), (0, 70)))
+        bt.run()
+
+        self.assertEqual({'2016-02-19', '2016-03-18'}, ExpirationStrategy.expirations[(0, 40)])
+        self.assertEqual(set(EXPIRATIONS), ExpirationStrategy.expirations[(0, 70)])
+
+    def test_default_verbosity_keeps_logging(self):
+        logger = logging.getLogger("kaleidoscope")
+        level, handlers = logger.level, list(logger.handlers)
+
+        Backtest(data=SQLiteDataFeed(self.path))
+
+        self.assertEqual(level, logger.level)
+        self.assertEqual(handlers, logger.handlers)
+        self.assertTrue(logger.propagate)
+
+    def test_verbosity(self):
+        logger = logging.getLogger("kaleidoscope")
+        level = logger.level
+
+        try:
+            Backtest(data=SQLiteDataFeed(self.path), verbosity=logging.WARNING)
+            self.assertEqual(logging.WARNING, logger.level)
+            self.assertFalse(any(isinstance(h, logging.StreamHandler) for h in logger.handlers))
+        finally:
+            logger.setLevel(level)
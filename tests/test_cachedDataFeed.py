@@ -0,0 +1,123 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+import pandas as pd
+
+from kaleidoscope.datafeeds.base import BaseDataFeed
+from kaleidoscope.datafeeds.cache import CachedDataFeed
+from kaleidoscope.datafeeds.sqlite_data import SQLiteDataFeed
+from tests.support import OPTION_CHAIN_COLUMNS, create_option_db, option_chain_rows
+
+DATES = ['2016-02-16', '2016-02-17', '2016-02-18', '2016-02-19']
+EXPIRATIONS = ['2016-02-19', '2016-02-26']
+
+
+class PlainDataFeed(BaseDataFeed):
+    def __init__(self, rows):
+        # a data feed written before BaseDataFeed had an __init__, it does not call it
+        self.data = pd.DataFrame(rows, columns=OPTION_CHAIN_COLUMNS)
+        self.opt_params = tuple((col, i) for i, col in enumerate(OPTION_CHAIN_COLUMNS))
+
+    def get(self, symbol, start=None, end=None,
+            exclude_splits=True, option_type=None, requirements=None):
+        return self._normalize(self.data, self.opt_params)
+
+
+class TestCachedDataFeed(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "securities.db")
+        create_option_db(self.db_path, "VXX", option_chain_rows("VXX", DATES, EXPIRATIONS, [19, 20, 21]))
+
+        self.source = SQLiteDataFeed(self.db_path)
+        self.feed = CachedDataFeed(self.source, os.path.join(self.tmp_dir.name, "cache"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_cached(self):
+        expected = self.source.get("VXX", start='2016-02-17')
+
+        with mock.patch.object(self.source, 'get', wraps=self.source.get) as get:
+            self.feed.get("VXX", start='2016-02-17')
+            data = self.feed.get("VXX", start='2016-02-17')
+
+            self.assertEqual(1, get.call_count)
+            self.assertTrue(expected.equals(data))
+
+    def test_get_sub_range_of_cached_range(self):
+        with mock.patch.object(self.source, 'get', wraps=self.source.get) as get:
+            self.feed.get("VXX")
+            data = self.feed.get("VXX", start='2016-02-17', end='2016-02-18')
+
+            self.assertEqual(1, get.call_count)
+            self.assertEqual(['2016-02-17', '2016-02-18'], sorted(data['quote_date'].dt.strftime('%Y-%m-%d').unique()))
+
+    def test_get_filters_are_cached_separately(self):
+        with mock.patch.object(self.source, 'get', wraps=self.source.get) as get:
+            self.feed.get("VXX")
+            data = self.feed.get("VXX", option_type='c')
+
+            self.assertEqual(2, get.call_count)
+            self.assertEqual(['c'], list(data['option_type'].unique()))
+
+    def test_source_change_invalidates_cache(self):
+        self.feed.get("VXX")
+        create_option_db(self.db_path, "SPY", option_chain_rows("SPY", DATES, EXPIRATIONS, [200]))
+
+        with mock.patch.object(self.source, 'get', wraps=self.source.get) as get:
+            self.feed.get("VXX")
+            self.assertEqual(1, get.call_count)
+
+    def test_invalidate_keeps_other_date_ranges(self):
+        self.feed.get("VXX", end='2016-02-17')
+        self.feed.get("VXX", start='2016-02-18')
+
+        previous = self.feed.signature()
+        create_option_db(self.db_path, "SPY", option_chain_rows("SPY", DATES, EXPIRATIONS, [200]))
+        self.feed.invalidate("VXX", '2016-02-19', '2016-02-19', previous)
+
+        with mock.patch.object(self.source, 'get', wraps=self.source.get) as get:
+            self.feed.get("VXX", end='2016-02-17')
+            self.assertEqual(0, get.call_count)
+
+            self.feed.get("VXX", start='2016-02-18')
+            self.assertEqual(1, get.call_count)
+
+    def test_quality_report_is_cached(self):
+        feed = CachedDataFeed(SQLiteDataFeed(self.db_path, clean=True), os.path.join(self.tmp_dir.name, "cache"))
+        feed.get("VXX")
+
+        with mock.patch.object(feed.datafeed, 'get', wraps=feed.datafeed.get) as get:
+            data = feed.get("VXX", start='2016-02-18')
+            self.assertEqual(0, get.call_count)
+
+        self.assertEqual(pd.to_datetime(DATES[2:]).tolist(), feed._quality(data)['quote_date'].tolist())
+        self.assertEqual(DATES, feed.quality_report()['quote_date'].dt.strftime('%Y-%m-%d').tolist())
+
+    def test_hash_signature_reads_changed_source_only(self):
+        feed = CachedDataFeed(self.source, os.path.join(self.tmp_dir.name, "cache"), validate='hash')
+        signature = feed.signature()
+
+        with mock.patch('builtins.open', wraps=open) as opened:
+            feed.get("VXX")
+            feed.get("VXX")
+            self.assertNotIn(self.db_path, [call.args[0] for call in opened.call_args_list])
+
+        create_option_db(self.db_path, "SPY", option_chain_rows("SPY", DATES, EXPIRATIONS, [200]))
+        self.assertNotEqual(signature, feed.signature())
+
+    def test_invalid_validate(self):
+        self.assertRaises(ValueError, CachedDataFeed, self.source, validate='size')
+
+    def test_feed_without_base_init(self):
+        source = PlainDataFeed(option_chain_rows("VXX", DATES, EXPIRATIONS, [20]))
+        feed = CachedDataFeed(source, os.path.join(self.tmp_dir.name, "plain"))
+
+        data = feed.get("VXX")
+
+        self.assertIn('mark', data.columns)
+        self.assertEqual(len(DATES) * len(EXPIRATIONS) * 2, len(data))
+        self.assertTrue(source.quality_report().empty)
+        self.assertEqual(0, source.bytes_saved)
@@ -0,0 +1,102 @@
+from unittest import TestCase
+
+import pandas as pd
+
+from kaleidoscope.options.chain_store import ChainDay, ChainStore
+from kaleidoscope.options.iterator.option_chain import OptionChainIterator
+from tests.support import OPTION_CHAIN_COLUMNS, option_chain_rows
+
+DATES = ['2016-02-16', '2016-02-17', '2016-02-18']
+EXPIRATIONS = ['2016-03-18', '2016-04-15']
+
+
+class TestChainStore(TestCase):
+    def setUp(self):
+        rows = option_chain_rows("VXX", DATES, EXPIRATIONS, [18, 20, 22])
+        # rows out of quote date order, the store orders them
+        self.data = pd.DataFrame(rows[::-1], columns=OPTION_CHAIN_COLUMNS)
+        self.store = ChainStore(self.data)
+
+    def test_contracts(self):
+        self.assertEqual(len(EXPIRATIONS) * 3 * 2, len(self.store.contracts))
+        self.assertFalse(self.store.contracts['symbol'].duplicated().any())
+        self.assertNotIn('strike', self.store.quotes.columns)
+        self.assertEqual(len(self.data), len(self.store))
+
+    def test_to_frame(self):
+        expected = self.data.sort_values('quote_date', kind='mergesort').reset_index(drop=True)
+        self.assertTrue(expected.equals(self.store.to_frame()))
+
+    def test_join_columns(self):
+        data = self.store.to_frame(['symbol', 'bid'])
+
+        self.assertEqual(['symbol', 'bid'], list(data.columns))
+        self.assertEqual(sorted(self.data['symbol'] + self.data['bid'].astype(str)),
+                         sorted(data['symbol'] + data['bid'].astype(str)))
+
+    def test_days(self):
+        days = list(self.store.days())
+
+        self.assertEqual(DATES, [day[0] for day in days])
+        for quote_date, option_chains in days:
+            self.assertEqual(list(self.data.columns), list(option_chains.columns))
+            self.assertTrue((option_chains['quote_date'] == quote_date).all())
+            self.assertEqual(len(EXPIRATIONS) * 3 * 2, len(option_chains))
+
+    def test_days_without_join(self):
+        quote_date, quotes = next(self.store.days(join=False))
+        self.assertIn('contract_id', quotes.columns)
+        self.assertNotIn('symbol', quotes.columns)
+
+    def test_days_lazy(self):
+        expected = list(self.store.days())
+        days = list(self.store.days(lazy=True))
+
+        self.assertEqual(DATES, [day[0] for day in days])
+        for (_, option_chains), (_, day) in zip(expected, days):
+            self.assertIsInstance(day, ChainDay)
+            self.assertNotIn('symbol', day.quotes.columns)
+            self.assertTrue(option_chains.equals(day.to_frame()))
+
+    def test_iterate_store(self):
+        events = list(OptionChainIterator(self.store))
+        self.assertEqual(DATES, [event.date for event in events])
+
+    def test_days_evict(self):
+        # the contracts of the first expiration are not quoted after the second quote date
+        rows = option_chain_rows("VXX", DATES, ['2016-02-17', '2016-03-18'], [18, 20])
+        data = pd.DataFrame(rows, columns=OPTION_CHAIN_COLUMNS)
+        store = ChainStore(data)
+
+        expected = list(ChainStore(data).days())
+        days = store.days(evict=True)
+
+        for i in range(2):
+            quote_date, option_chains = next(days)
+            self.assertEqual(expected[i][0], quote_date)
+            self.assertTrue(expected[i][1].equals(option_chains))
+
+        # the first two quote dates and the expired contracts are evicted before the third one
+        quote_date, option_chains = next(days)
+        self.assertTrue(expected[2][1].equals(option_chains))
+        self.assertEqual(DATES[2:], list(store.dates))
+        self.assertEqual(4, len(store.contracts))
+        self.assertEqual(4, len(store))
+        self.assertTrue(store.contracts['expiration'].eq('2016-03-18').all())
+
+        self.assertEqual([], list(days))
+        self.assertEqual(0, len(store))
+
+    def test_days_lazy_evict(self):
+        # days are joined with the contracts of the store when they were reached, after the
+        # iteration evicted them from the store
+        rows = option_chain_rows("VXX", DATES, ['2016-02-17', '2016-03-18'], [18, 20])
+        data = pd.DataFrame(rows, columns=OPTION_CHAIN_COLUMNS)
+        store = ChainStore(data)
+
+        expected = list(ChainStore(data).days())
+        days = list(store.days(evict=True, lazy=True))
+
+        self.assertEqual(0, len(store.contracts))
+        for (_, option_chains), (_, day) in zip(expected, days):
+            self.assertTrue(option_chains.equals(day.to_frame()))
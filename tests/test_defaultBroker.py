@@ -1,4 +1,116 @@
-from unittest import TestCase
+import queue
+import threading
+import time
+from unittest import TestCase, mock
+
+import pandas as pd
+
+from kaleidoscope.account import Account
+from kaleidoscope.brokers.default_broker import DefaultBroker
+from kaleidoscope.commissions import default_commissions
+from kaleidoscope.datafeeds.base import BaseDataFeed
+from kaleidoscope.globals import OrderAction, OrderStatus, OrderTIF, OrderType
+from kaleidoscope.margin import tos_margin
+from kaleidoscope.options.chain_store import ChainDay
+from kaleidoscope.options.option import Option
+from kaleidoscope.order import Order
+from kaleidoscope.position import Position
+from tests.support import option_quote
+
+
+class BarrierDataFeed(BaseDataFeed):
+    """
+    Data feed whose get calls only return once all expected calls are running.
+    """
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self.calls = list()
+
+    def get(self, symbol, start=None, end=None,
+            exclude_splits=True, option_type=None):
+        self.calls.append((symbol, start, end, exclude_splits, option_type))
+        self.barrier.wait()
+        return option_quote(symbol)
+
+
+class CountingDataFeed(BaseDataFeed):
+    """
+    Data feed recording the most get calls running at the same time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def get(self, symbol, start=None, end=None,
+            exclude_splits=True, option_type=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(0.05)
+
+        with self.lock:
+            self.running -= 1
+
+        return option_quote(symbol)
+
+
+class BatchDataFeed(BaseDataFeed):
+    """
+    Data feed reading several symbols in one get_many call.
+    """
+    batch_symbols = True
+
+    def __init__(self):
+        self.calls = list()
+
+    def get(self, symbol, start=None, end=None,
+            exclude_splits=True, option_type=None):
+        self.calls.append(('get', [symbol]))
+        return option_quote(symbol)
+
+    def get_many(self, symbols, start=None, end=None,
+                 exclude_splits=True, option_type=None):
+        self.calls.append(('get_many', symbols))
+        return {symbol: option_quote(symbol) for symbol in symbols}
+
+
+class PartitionedDataFeed(BaseDataFeed):
+    """
+    Data feed with one quote date in each of two monthly partitions.
+    """
+
+    def __init__(self):
+        self.calls = list()
+        self.requested = [threading.Event(), threading.Event()]
+
+    def partitions(self, symbol, start=None, end=None):
+        return [('2016-01-01', '2016-01-31'), ('2016-02-01', '2016-02-29')]
+
+    def get(self, symbol, start=None, end=None,
+            exclude_splits=True, option_type=None):
+        self.calls.append((start, end))
+        self.requested[len(self.calls) - 1].set()
+        return option_quote(symbol, start[:8] + '16')
+
+
+class SpreadStub(object):
+    """
+    Option strategy with two call legs, without the spread construction of OptionStrategy.
+    """
+
+    def __init__(self):
+        self.legs = [{'contract': Option({'symbol': "VXX160219C00020000", 'underlying_symbol': "VXX", 'mark': 1.0}),
+                      'quantity': 1},
+                     {'contract': Option({'symbol': "VXX160219C00022000", 'underlying_symbol': "VXX", 'mark': 0.5}),
+                      'quantity': -1}]
+        self.mark = self.calc_mark()
+
+    def calc_mark(self):
+        return sum(leg['contract'].mark * leg['quantity'] for leg in self.legs)
 
 
 class TestDefaultBroker(TestCase):
@@ -13,3 +125,158 @@ class TestDefaultBroker(TestCase):
 
     def test_generate_ticket(self):
         self.fail()
+
+    def test_source_loads_subscriptions_concurrently(self):
+        datafeed = BarrierDataFeed(3)
+        broker = DefaultBroker(datafeed, default_commissions, tos_margin, queue.Queue())
+        broker.set_account(Account())
+
+        for symbol in ("VXX", "SPY", "QQQ"):
+            broker.source(symbol, '2016-02-16', '2016-02-19')
+
+        # nothing is loaded until the backtest starts streaming
+        self.assertEqual([], datafeed.calls)
+
+        broker.stream_next()
+        event = broker.queue.get(False)
+
+        self.assertEqual(["VXX", "SPY", "QQQ"], list(broker.data))
+        self.assertEqual(["QQQ", "SPY", "VXX"], sorted(event.quotes.option_chain['underlying_symbol']))
+        self.assertIn(('VXX', '2016-02-16', '2016-02-19', True, None), datafeed.calls)
+
+    def test_load_batches_symbols(self):
+        datafeed = BatchDataFeed()
+        broker = DefaultBroker(datafeed, default_commissions, tos_margin, queue.Queue())
+        broker.set_account(Account())
+
+        broker.source("VXX", '2016-02-16', '2016-02-19')
+        broker.source("SPY", '2016-02-16', '2016-02-19')
+        broker.source("QQQ", '2016-02-16', '2016-02-19', option_type='c')
+        broker.stream_next()
+
+        # symbols sharing their subscription params are read together
+        self.assertEqual([('get', ["QQQ"]), ('get_many', ["VXX", "SPY"])], sorted(datafeed.calls))
+        self.assertEqual(["VXX", "SPY", "QQQ"], list(broker.data))
+
+    def test_max_workers(self):
+        datafeed = CountingDataFeed()
+        broker = DefaultBroker(datafeed, default_commissions, tos_margin, queue.Queue(), max_workers=2)
+        broker.set_account(Account())
+
+        for symbol in ("VXX", "SPY", "QQQ", "IWM"):
+            broker.source(symbol, '2016-02-16', '2016-02-19')
+
+        broker.stream_next()
+
+        self.assertEqual(4, len(broker.data))
+        self.assertEqual(2, datafeed.max_running)
+
+    def test_out_of_core_loads_next_partition_ahead(self):
+        datafeed = PartitionedDataFeed()
+        broker = DefaultBroker(datafeed, default_commissions, tos_margin, queue.Queue(), out_of_core=True)
+        broker.set_account(Account())
+        broker.source("VXX")
+
+        broker.stream_next()
+        self.assertEqual('2016-01-16', broker.queue.get(False).date.strftime("%Y-%m-%d"))
+
+        # the second partition is requested while the first one is iterated
+        self.assertTrue(datafeed.requested[1].wait(5))
+        self.assertEqual([('2016-01-01', '2016-01-31'), ('2016-02-01', '2016-02-29')], datafeed.calls)
+
+        broker.stream_next()
+        self.assertEqual('2016-02-16', broker.queue.get(False).date.strftime("%Y-%m-%d"))
+        self.assertEqual({}, broker.data)
+
+    def test_evict_releases_loaded_symbols(self):
+        datafeed = BarrierDataFeed(1)
+        broker = DefaultBroker(datafeed, default_commissions, tos_margin, queue.Queue(), evict=True)
+        broker.set_account(Account())
+        broker.source("VXX", '2016-02-16', '2016-02-19')
+
+        broker.stream_next()
+        self.assertEqual(1, len(broker.queue.get(False).quotes.option_chain))
+        self.assertEqual({}, broker.data)
+
+        broker.stream_next()
+        self.assertFalse(broker.continue_backtest)
+
+    def test_prefetch(self):
+        datafeed = PartitionedDataFeed()
+        broker = DefaultBroker(datafeed, default_commissions, tos_margin, queue.Queue(), out_of_core=True,
+                               prefetch=2)
+        broker.set_account(Account())
+        broker.source("VXX")
+
+        dates = list()
+        while broker.continue_backtest:
+            broker.stream_next()
+            if not broker.queue.empty():
+                dates.append(broker.queue.get(False).date.strftime("%Y-%m-%d"))
+
+        self.assertEqual(['2016-01-16', '2016-02-16'], dates)
+
+    def test_prefetch_joins_in_background(self):
+        broker = DefaultBroker(BarrierDataFeed(1), default_commissions, tos_margin, queue.Queue(), prefetch=1)
+        broker.set_account(Account())
+        broker.source("VXX")
+
+        threads = list()
+        to_frame = ChainDay.to_frame
+
+        def record(day, columns=None):
+            threads.append(threading.current_thread())
+            return to_frame(day, columns)
+
+        with mock.patch.object(ChainDay, 'to_frame', record):
+            broker.stream_next()
+            broker._close_stream()
+
+        self.assertEqual(1, len(threads))
+        self.assertIsNot(threading.main_thread(), threads[0])
+        self.assertEqual(["VXX160219C00020000"], list(broker.queue.get(False).quotes.fetch()['symbol']))
+
+    def test_skip_update_without_positions(self):
+        broker = DefaultBroker(BarrierDataFeed(1), default_commissions, tos_margin, queue.Queue())
+        broker.set_account(Account())
+        broker.source("VXX")
+
+        broker.stream_next()
+        self.assertFalse(broker.active())
+        self.assertIsNone(broker.quotes)
+
+    def test_working_order_without_leg_quote(self):
+        broker = DefaultBroker(BarrierDataFeed(1), default_commissions, tos_margin, queue.Queue())
+        broker.set_account(Account())
+
+        order = Order(1, None, SpreadStub(), OrderAction.BUY, 1, OrderType.LMT, OrderTIF.GTC, 0.2,
+                      lambda legs: 0, lambda strategy, action: 0)
+        order.status = OrderStatus.WORKING
+        broker.order_list[order.ticket] = order
+
+        # the short leg has no quote, the long leg's quote would meet the limit on its own
+        quotes = pd.DataFrame({'symbol': ["VXX160219C00020000"], 'underlying_symbol': ["VXX"], 'mark': [0.1]})
+        broker.update_data(quotes)
+
+        self.assertEqual(OrderStatus.WORKING, order.status)
+        self.assertEqual(0.5, order.mark)
+        self.assertEqual(1.0, order.order_strat.legs[0]['contract'].mark)
+
+    def test_update_from_symbol_chains(self):
+        broker = DefaultBroker(BarrierDataFeed(2), default_commissions, tos_margin, queue.Queue())
+        broker.set_account(Account())
+        broker.account.positions.append(
+            Position(Option({'symbol': "SPY160219C00020000", 'underlying_symbol': "SPY", 'mark': 0.5}), 1))
+
+        broker.source("VXX", '2016-02-16', '2016-02-19')
+        broker.source("SPY", '2016-02-16', '2016-02-19')
+        broker.stream_next()
+        event = broker.queue.get(False)
+
+        self.assertAlmostEqual(1.1, broker.account.positions[0].mark)
+        # the option chains of the symbols are never combined for the broker
+        self.assertIsNone(event._option_chains)
+
+    def test_streaming_and_out_of_core(self):
+        self.assertRaises(ValueError, DefaultBroker, PartitionedDataFeed(), default_commissions, tos_margin,
+                          queue.Queue(), streaming=True, out_of_core=True)
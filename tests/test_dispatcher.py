@@ -0,0 +1,43 @@
+import queue
+from unittest import TestCase
+
+from kaleidoscope.dispatcher import Dispatcher, EventQueue
+from kaleidoscope.event import Event, EventType
+
+
+class TestDispatcher(TestCase):
+    def setUp(self):
+        self.events = EventQueue()
+        self.dispatcher = Dispatcher(self.events)
+        self.handled = list()
+
+    def test_event_queue(self):
+        self.assertTrue(self.events.empty())
+        self.events.put(1)
+        self.events.put(2)
+
+        self.assertEqual(1, self.events.get(False))
+        self.assertEqual(2, self.events.get())
+        self.assertRaises(queue.Empty, self.events.get, False)
+
+    def test_dispatch_in_order(self):
+        def on_data(event):
+            self.handled.append(event)
+            # handlers can queue further events of the same day
+            self.events.put(Event(EventType.ORDER, event.date))
+
+        self.dispatcher.register(EventType.DATA, on_data)
+        self.dispatcher.register(EventType.ORDER, self.handled.append)
+
+        self.events.put(Event(EventType.DATA, '2016-02-16'))
+        self.events.put(None)
+        self.events.put(Event(EventType.DATA, '2016-02-17'))
+
+        self.assertEqual(4, self.dispatcher.dispatch())
+        self.assertEqual([EventType.DATA, EventType.DATA, EventType.ORDER, EventType.ORDER],
+                         [event.event_type for event in self.handled])
+        self.assertTrue(self.events.empty())
+
+    def test_unregistered_event_type(self):
+        self.events.put(Event(EventType.FILL, '2016-02-16'))
+        self.assertRaises(NotImplementedError, self.dispatcher.dispatch)
@@ -0,0 +1,91 @@
+import logging
+from unittest import TestCase
+
+import pandas as pd
+
+from kaleidoscope.event import DataEvent, FillEvent, OrderEvent, RejectedEvent
+from kaleidoscope.options.chain_store import ChainStore
+from tests.support import OPTION_CHAIN_COLUMNS, option_chain_rows
+
+
+class StubOrder(object):
+    ticket = 123456
+    mark = 1.0
+    action = None
+    quantity = -10
+    total_cost = -1000
+    margin = 200
+    commissions = 10
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "-10 SELL @1.00 VERTICAL VXX 19 FEB 16 18/20"
+
+
+class TestEvent(TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("kaleidoscope.event")
+        self.level = self.logger.level
+
+    def tearDown(self):
+        self.logger.setLevel(self.level)
+
+    def test_slots(self):
+        event = DataEvent(pd.Timestamp('2016-02-19'), pd.DataFrame())
+        self.assertFalse(hasattr(event, '__dict__'))
+        self.assertRaises(AttributeError, setattr, event, 'other', 1)
+
+    def test_join_on_access(self):
+        rows = option_chain_rows("VXX", ['2016-02-19'], ['2016-03-18'], [20])
+        data = pd.DataFrame(rows, columns=OPTION_CHAIN_COLUMNS)
+        quote_date, day = next(ChainStore(data).days(lazy=True))
+        event = DataEvent(quote_date, {"VXX": day})
+
+        self.assertFalse(event._joined)
+        self.assertEqual(['VXX160318C00020000', 'VXX160318P00020000'],
+                         sorted(event.quotes.option_chain['symbol']))
+        self.assertTrue(event._joined)
+        self.assertEqual(2, len(event.option_chains))
+
+    def test_fetch_does_not_change_quotes(self):
+        rows = option_chain_rows("VXX", ['2016-02-19'], ['2016-03-18'], [20])
+        event = DataEvent(pd.Timestamp('2016-02-19'), pd.DataFrame(rows, columns=OPTION_CHAIN_COLUMNS))
+
+        data = event.quotes.fetch()
+        data['symbol'] = '.' + data['symbol']
+
+        self.assertEqual(['VXX160318C00020000'], list(event.quotes.calls().fetch()['symbol']))
+
+    def test_log_fill(self):
+        order = StubOrder()
+
+        with self.assertLogs("kaleidoscope.event", logging.INFO) as logs:
+            FillEvent(pd.Timestamp('2016-02-19'), order)
+
+        self.assertEqual(["ORDER #123456 FILLED ON 2016-02-19: -10 SELL @1.00 VERTICAL VXX 19 FEB 16 18/20"],
+                         [record.getMessage() for record in logs.records])
+
+    def test_log_string_date(self):
+        with self.assertLogs("kaleidoscope.event", logging.INFO) as logs:
+            OrderEvent('2016-02-19', StubOrder())
+
+        self.assertIn("OPENED ON 2016-02-19:", logs.records[0].getMessage())
+
+    def test_log_rejected(self):
+        with self.assertLogs("kaleidoscope.event", logging.INFO) as logs:
+            RejectedEvent(pd.Timestamp('2016-02-19'), StubOrder()).print_event()
+
+        self.assertIn("ORDER #123456 REJECTED ON 2016-02-19:", logs.records[0].getMessage())
+
+    def test_quiet(self):
+        order = StubOrder()
+        self.logger.setLevel(logging.WARNING)
+
+        OrderEvent(pd.Timestamp('2016-02-19'), order)
+        FillEvent(pd.Timestamp('2016-02-19'), order)
+
+        # orders are not formatted when their events are not logged
+        self.assertEqual(0, order.formatted)
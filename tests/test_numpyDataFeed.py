@@ -0,0 +1,109 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from kaleidoscope.datafeeds.numpy_data import NumpyDataFeed, append_chains, convert_sqlite, write_chains
+from kaleidoscope.datafeeds.sqlite_data import SQLiteDataFeed
+from tests.support import create_option_db, option_chain_rows
+
+DATES = ['2016-02-16', '2016-02-17', '2016-02-18', '2016-02-19']
+EXPIRATIONS = ['2016-02-19', '2016-02-26']
+
+
+class TestNumpyDataFeed(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "securities.db")
+        self.path = os.path.join(self.tmp_dir.name, "store")
+
+        rows = option_chain_rows("VXX", DATES, EXPIRATIONS, [19, 20, 21])
+        rows += option_chain_rows("VXX", DATES, EXPIRATIONS, [20], root="VXX1")
+        create_option_db(self.db_path, "VXX", rows)
+
+        convert_sqlite(self.path, ["VXX"], self.db_path)
+        self.feed = NumpyDataFeed(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_columns_are_memory_mapped(self):
+        store = self.feed._open("VXX")
+        self.assertTrue(all(isinstance(col, np.memmap) for col in store['columns'].values()))
+
+    def test_get(self):
+        data = self.feed.get("VXX", start='2016-02-17', option_type='c')
+        expected = SQLiteDataFeed(self.db_path).get("VXX", start='2016-02-17', option_type='c')
+
+        self.assertEqual(list(expected.columns), list(data.columns))
+        self.assertEqual(sorted(expected['symbol']), sorted(data['symbol']))
+
+    def test_stream(self):
+        days = list(self.feed.stream("VXX", end='2016-02-18', exclude_splits=False))
+
+        self.assertEqual(pd.to_datetime(DATES[:3]).tolist(), [day[0] for day in days])
+        for quote_date, option_chains in days:
+            self.assertTrue((option_chains['quote_date'] == quote_date).all())
+            self.assertEqual(len(EXPIRATIONS) * 3 * 2, len(option_chains))
+
+    def test_get_missing_symbol(self):
+        self.assertRaises(IOError, self.feed.get, "SPY")
+
+
+class TestPartitionedNumpyDataFeed(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "securities.db")
+        self.path = os.path.join(self.tmp_dir.name, "store")
+
+        self.dates = ['2016-01-28', '2016-01-29', '2016-02-01', '2016-02-02']
+        create_option_db(self.db_path, "VXX", option_chain_rows("VXX", self.dates, EXPIRATIONS, [19, 20, 21]))
+
+        convert_sqlite(self.path, ["VXX"], self.db_path, partition='month')
+        self.feed = NumpyDataFeed(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_partitions(self):
+        self.assertTrue(os.path.isdir(os.path.join(self.path, "VXX", "2016-01")))
+        self.assertEqual([('2016-01-01', '2016-01-31'), ('2016-02-01', '2016-02-29')], self.feed.partitions("VXX"))
+        self.assertEqual([('2016-01-29', '2016-01-31')], self.feed.partitions("VXX", '2016-01-29', '2016-01-31'))
+
+    def test_get_across_partitions(self):
+        data = self.feed.get("VXX", start='2016-01-29', end='2016-02-01')
+        self.assertEqual(pd.to_datetime(self.dates[1:3]).tolist(), sorted(data['quote_date'].unique()))
+
+        # partitions are not kept open once read
+        self.assertEqual({}, self.feed.stores)
+
+    def test_get_outside_partitions(self):
+        self.assertTrue(self.feed.get("VXX", start='2016-03-01').empty)
+
+    def test_stream(self):
+        days = list(self.feed.stream("VXX"))
+        self.assertEqual(pd.to_datetime(self.dates).tolist(), [day[0] for day in days])
+
+    def test_write_replaces_months(self):
+        data = self.feed.get("VXX", start='2016-02-01')
+        write_chains(self.path, "VXX", data.iloc[:3], partition='month')
+
+        self.assertEqual(2, len(self.feed.partitions("VXX")))
+        self.assertEqual(3, len(self.feed.get("VXX", start='2016-02-01')))
+
+    def test_append_rewrites_new_months_only(self):
+        january = os.path.join(self.path, "VXX", "2016-01", "bid.npy")
+        mtime = os.stat(january).st_mtime_ns
+
+        data = SQLiteDataFeed(self.db_path).get("VXX", start='2016-02-02')
+        data['quote_date'] = pd.Timestamp('2016-03-01')
+
+        self.assertEqual(len(data), append_chains(self.path, "VXX", data))
+        self.assertEqual(0, append_chains(self.path, "VXX", data))
+
+        self.assertEqual(mtime, os.stat(january).st_mtime_ns)
+        self.assertEqual(3, len(self.feed.partitions("VXX")))
+        self.assertEqual(pd.to_datetime(self.dates + ['2016-03-01']).tolist(),
+                         [day[0] for day in self.feed.stream("VXX")])
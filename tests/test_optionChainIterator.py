@@ -0,0 +1,142 @@
+import threading
+from unittest import TestCase
+
+import pandas as pd
+
+from kaleidoscope.options.iterator.option_chain import OptionChainIterator, PrefetchIterator, iter_days, \
+    merge_days
+
+
+def chains(symbol, dates):
+    return pd.DataFrame({'underlying_symbol': symbol, 'quote_date': dates,
+                         'expiration': '2016-03-18', 'strike': 20.0})
+
+
+class TestOptionChainIterator(TestCase):
+    def test_iterate_dataframe(self):
+        data = chains("VXX", ['2016-02-17', '2016-02-16', '2016-02-17'])
+        events = list(OptionChainIterator(data))
+
+        self.assertEqual(['2016-02-16', '2016-02-17'], [event.date for event in events])
+        self.assertEqual([1, 2], [len(event.quotes.option_chain) for event in events])
+
+    def test_iterate_dataframe_slices(self):
+        data = chains("VXX", pd.to_datetime(['2016-02-18', '2016-02-16', '2016-02-18', '2016-02-17']))
+        events = list(OptionChainIterator(data))
+
+        self.assertEqual(pd.to_datetime(['2016-02-16', '2016-02-17', '2016-02-18']).tolist(),
+                         [event.date for event in events])
+        self.assertEqual([1, 1, 2], [len(event.quotes.option_chain) for event in events])
+
+    def test_lazy_quotes(self):
+        data = chains("VXX", ['2016-02-16'])
+        event = next(OptionChainIterator(data))
+
+        self.assertIs(event.quotes, event.quotes)
+        # the option chains are only copied once they are queried
+        self.assertIsNone(event.quotes._option_chain)
+        self.assertEqual(1, len(event.quotes.option_chain))
+        self.assertEqual(list(range(1)), event.quotes.option_chain.index.tolist())
+
+    def test_merge_days(self):
+        vxx = [('2016-02-16', chains("VXX", ['2016-02-16'])),
+               ('2016-02-18', chains("VXX", ['2016-02-18']))]
+        spy = [('2016-02-17', chains("SPY", ['2016-02-17'])),
+               ('2016-02-18', chains("SPY", ['2016-02-18']))]
+
+        days = list(merge_days([iter(vxx), iter(spy)]))
+
+        self.assertEqual(pd.to_datetime(['2016-02-16', '2016-02-17', '2016-02-18']).tolist(),
+                         [day[0] for day in days])
+        self.assertEqual(["SPY", "VXX"], sorted(days[2][1]['underlying_symbol']))
+
+    def test_merge_days_by_symbol(self):
+        vxx = [('2016-02-16', chains("VXX", ['2016-02-16'])),
+               ('2016-02-17', chains("VXX", ['2016-02-17']))]
+        spy = [('2016-02-17', chains("SPY", ['2016-02-17', '2016-02-17']))]
+
+        days = list(merge_days({"VXX": iter(vxx), "SPY": iter(spy)}))
+
+        self.assertEqual([["VXX"], ["VXX", "SPY"]], [list(day[1]) for day in days])
+        self.assertIs(spy[0][1], days[1][1]["SPY"])
+
+    def test_event_by_symbol(self):
+        spy = chains("SPY", ['2016-02-17', '2016-02-17'])
+        days = merge_days({"VXX": iter([('2016-02-17', chains("VXX", ['2016-02-17']))]),
+                           "SPY": iter([('2016-02-17', spy)])})
+        event = next(OptionChainIterator(days))
+
+        self.assertEqual(3, len(event.option_chains))
+        self.assertEqual(3, len(event.quotes.option_chain))
+        self.assertIs(event.quotes["SPY"], event.quotes["SPY"])
+        self.assertEqual(["SPY", "SPY"], event.quotes["SPY"].option_chain['underlying_symbol'].tolist())
+        self.assertEqual(0, len(event.quotes["QQQ"].option_chain))
+
+    def test_event_dataframe_by_symbol(self):
+        event = next(OptionChainIterator(pd.concat([chains("VXX", ['2016-02-17']), chains("SPY", ['2016-02-17'])])))
+
+        self.assertEqual(["VXX"], event.quotes["VXX"].option_chain['underlying_symbol'].tolist())
+
+    def test_merge_days_mixed_date_types(self):
+        vxx = [('2016-02-16', chains("VXX", ['2016-02-16']))]
+        spy = [(pd.Timestamp('2016-02-16'), chains("SPY", ['2016-02-16']))]
+
+        days = list(merge_days([iter(vxx), iter(spy)]))
+
+        self.assertEqual([pd.Timestamp('2016-02-16')], [day[0] for day in days])
+        self.assertEqual(2, len(days[0][1]))
+
+    def test_iterate_stream(self):
+        stream = merge_days([iter([('2016-02-16', chains("VXX", ['2016-02-16']))])])
+        events = list(OptionChainIterator(stream))
+
+        self.assertEqual([pd.Timestamp('2016-02-16')], [event.date for event in events])
+
+    def test_iter_days(self):
+        data = chains("VXX", ['2016-02-17', '2016-02-16', '2016-02-17'])
+        days = list(iter_days(data))
+
+        self.assertEqual(['2016-02-16', '2016-02-17'], [day[0] for day in days])
+        self.assertEqual([1, 2], [len(day[1]) for day in days])
+
+
+class TestPrefetchIterator(TestCase):
+    def test_prefetch_in_order(self):
+        self.assertEqual(list(range(10)), list(PrefetchIterator(range(10), 3)))
+
+    def test_prefetch_ahead(self):
+        produced = [threading.Event() for _ in range(3)]
+
+        def items():
+            for i in range(3):
+                produced[i].set()
+                yield i
+
+        days = PrefetchIterator(items(), 1)
+
+        # the item after the buffered one is prepared while the first one is processed
+        self.assertEqual(0, next(days))
+        self.assertTrue(produced[2].wait(5))
+        self.assertEqual([1, 2], list(days))
+
+    def test_prefetch_error(self):
+        def items():
+            yield 1
+            raise IOError("source failed")
+
+        days = PrefetchIterator(items())
+
+        self.assertEqual(1, next(days))
+        self.assertRaises(IOError, next, days)
+        self.assertEqual([], list(days))
+
+    def test_close(self):
+        days = PrefetchIterator(iter(range(100)), 1)
+        days.close()
+
+        self.assertEqual([], list(days))
+        days._thread.join(5)
+        self.assertFalse(days._thread.is_alive())
+
+    def test_size(self):
+        self.assertRaises(ValueError, PrefetchIterator, [], 0)
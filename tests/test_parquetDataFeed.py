@@ -0,0 +1,74 @@
+import os
+import tempfile
+from unittest import TestCase, skipIf
+
+import pandas as pd
+
+from kaleidoscope.datafeeds import parquet_data
+from kaleidoscope.helpers import DERIVED_COLUMNS
+from tests.support import OPTION_CHAIN_COLUMNS, option_chain_rows
+
+DATES = ['2016-02-16', '2016-02-17', '2016-02-18', '2016-02-19']
+EXPIRATIONS = ['2016-02-19', '2016-02-26']
+
+
+@skipIf(parquet_data.ds is None, "pyarrow is not installed")
+class TestParquetDataFeed(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.tmp_dir.name, "VXX"))
+
+        rows = option_chain_rows("VXX", DATES, EXPIRATIONS, [19, 20, 21])
+        rows += option_chain_rows("VXX", DATES, EXPIRATIONS, [20], root="VXX1")
+
+        data = pd.DataFrame(rows, columns=OPTION_CHAIN_COLUMNS)
+        data['quote_date'] = pd.to_datetime(data['quote_date']).dt.date
+        data['expiration'] = pd.to_datetime(data['expiration']).dt.date
+
+        # write the days in separate files, partitioned by symbol
+        for quote_date, day in data.groupby('quote_date'):
+            day.to_parquet(os.path.join(self.tmp_dir.name, "VXX", "%s.parquet" % quote_date), index=False)
+
+        self.feed = parquet_data.ParquetDataFeed(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_selects_mapped_columns(self):
+        data = self.feed.get("VXX")
+        mapped = [col[0] for col in self.feed.opt_params if col[1] != -1]
+
+        self.assertEqual(mapped + list(DERIVED_COLUMNS), list(data.columns))
+        self.assertTrue((data['root'] == "VXX").all())
+        self.assertEqual(len(DATES) * len(EXPIRATIONS) * 3 * 2, len(data))
+        self.assertEqual('datetime64[ns]', str(data['quote_date'].dtype))
+
+    def test_get_filters(self):
+        data = self.feed.get("VXX", start='2016-02-17', end='2016-02-18',
+                             exclude_splits=False, option_type='p')
+
+        self.assertEqual(['p'], list(data['option_type'].unique()))
+        self.assertEqual(pd.to_datetime(['2016-02-17', '2016-02-18']).tolist(),
+                         sorted(data['quote_date'].unique()))
+        self.assertIn("VXX1160219P00020000", set(data['symbol']))
+
+    def test_partitions(self):
+        rows = option_chain_rows("VXX", ['2016-03-01'], ['2016-03-18'], [20])
+        data = pd.DataFrame(rows, columns=OPTION_CHAIN_COLUMNS)
+        data['quote_date'] = pd.to_datetime(data['quote_date']).dt.date
+        data['expiration'] = pd.to_datetime(data['expiration']).dt.date
+        data.to_parquet(os.path.join(self.tmp_dir.name, "VXX", "2016-03-01.parquet"), index=False)
+
+        feed = parquet_data.ParquetDataFeed(self.tmp_dir.name)
+
+        self.assertEqual([('2016-02-17', '2016-02-29'), ('2016-03-01', '2016-03-31')],
+                         feed.partitions("VXX", start='2016-02-17'))
+        self.assertEqual([('2016-02-01', '2016-02-29')], feed.partitions("VXX", end='2016-02-29'))
+
+    def test_get_missing_dataset(self):
+        feed = parquet_data.ParquetDataFeed(os.path.join(self.tmp_dir.name, "missing"))
+        self.assertRaises(IOError, feed.get, "VXX")
+
+    def test_get_invalid_symbol(self):
+        self.assertRaises(ValueError, self.feed.get, "../VXX")
+        self.assertRaises(ValueError, self.feed.get, os.path.join(self.tmp_dir.name, "VXX"))
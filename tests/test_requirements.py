@@ -0,0 +1,59 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+
+from kaleidoscope.datafeeds.requirements import Requirements
+from kaleidoscope.datafeeds.sqlite_data import SQLiteDataFeed
+from kaleidoscope.globals import Period
+from tests.support import OPTION_CHAIN_COLUMNS, create_option_db, option_chain_rows
+
+DATES = ['2016-02-16', '2016-02-17', '2016-02-18', '2016-02-19']
+EXPIRATIONS = ['2016-02-19', '2016-02-26', '2016-03-18']
+
+
+class TestRequirements(TestCase):
+    def setUp(self):
+        self.rows = option_chain_rows("VXX", DATES, EXPIRATIONS, [16, 18, 20, 22, 24])
+        self.data = pd.DataFrame(self.rows, columns=OPTION_CHAIN_COLUMNS)
+
+    def test_band_period(self):
+        requirements = Requirements(dte=(None, Period.ONE_WEEK))
+        self.assertEqual((None, 7), requirements.dte)
+
+    def test_invalid_band(self):
+        self.assertRaises(ValueError, Requirements, dte=(7,))
+
+    def test_apply(self):
+        data = Requirements(dte=(0, 7), moneyness=(0.9, 1.1)).apply(self.data)
+        dte = (pd.to_datetime(data['expiration']) - pd.to_datetime(data['quote_date'])).dt.days
+        moneyness = data['strike'] / data['underlying_price']
+
+        self.assertFalse(data.empty)
+        self.assertTrue(dte.between(0, 7).all())
+        self.assertTrue(moneyness.between(0.9, 1.1).all())
+
+    def test_expirations(self):
+        requirements = Requirements(dte=(2, 7))
+        self.assertEqual(('2016-02-18', '2016-02-26'), requirements.expirations('2016-02-16', '2016-02-19'))
+        self.assertEqual((None, None), Requirements(delta=(0.2, 0.5)).expirations('2016-02-16', '2016-02-19'))
+
+    def test_sqlite_pushdown_matches_apply(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, "securities.db")
+        create_option_db(path, "VXX", self.rows)
+
+        requirements = Requirements(dte=(0, Period.ONE_WEEK), moneyness=(0.9, 1.1), delta=(0.4, 0.6))
+        feed = SQLiteDataFeed(path)
+
+        try:
+            data = feed.get("VXX", requirements=requirements)
+            expected = requirements.apply(feed.get("VXX"))
+        finally:
+            feed.close()
+            tmp_dir.cleanup()
+
+        self.assertFalse(data.empty)
+        self.assertEqual(sorted(expected['symbol'] + expected['quote_date'].astype(str)),
+                         sorted(data['symbol'] + data['quote_date'].astype(str)))
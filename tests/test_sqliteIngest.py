@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import tempfile
+from unittest import TestCase, mock
+
+import pandas as pd
+
+from kaleidoscope.datafeeds import sqlite_ingest
+from kaleidoscope.datafeeds.cache import CachedDataFeed
+from kaleidoscope.datafeeds.sqlite_data import SQLiteDataFeed
+from tests.support import OPTION_CHAIN_COLUMNS, option_chain_rows
+
+DATES = ['2016-02-16', '2016-02-17', '2016-02-18', '2016-02-19']
+EXPIRATIONS = ['2016-02-19', '2016-02-26']
+
+
+class TestSQLiteIngest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "securities.db")
+
+        rows = option_chain_rows("VXX", DATES, EXPIRATIONS, [19, 20, 21])
+        self.data = pd.DataFrame(rows, columns=OPTION_CHAIN_COLUMNS)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def query_plan(self, query, args):
+        data_conn = sqlite3.connect(self.path)
+        try:
+            return " ".join(row[-1] for row in data_conn.execute("EXPLAIN QUERY PLAN " + query, args))
+        finally:
+            data_conn.close()
+
+    def test_ingest(self):
+        rows = sqlite_ingest.ingest("VXX", self.data, self.path)
+
+        feed = SQLiteDataFeed(self.path)
+        data = feed.get("VXX", start='2016-02-17', end='2016-02-18')
+        feed.close()
+
+        self.assertEqual(len(self.data), rows)
+        self.assertEqual(['2016-02-17', '2016-02-18'], sorted(data['quote_date'].dt.strftime('%Y-%m-%d').unique()))
+
+        plan = self.query_plan("SELECT * FROM VXX_option_chain WHERE root = ? AND quote_date >= ?",
+                               ["VXX", '2016-02-17'])
+        self.assertIn("USING INDEX VXX_option_chain_key", plan)
+
+    def test_ingest_again_replaces(self):
+        sqlite_ingest.ingest("VXX", self.data, self.path)
+        sqlite_ingest.ingest("VXX", self.data, self.path)
+
+        feed = SQLiteDataFeed(self.path)
+        data = feed.get("VXX")
+        feed.close()
+
+        self.assertEqual(len(self.data), len(data))
+
+    def test_index_upgrades_key_to_unique(self):
+        data_conn = sqlite3.connect(self.path)
+        sqlite_ingest.create_table(data_conn, "VXX")
+        # key index of an older version, which did not prevent duplicate quotes
+        data_conn.execute("DROP INDEX VXX_option_chain_key")
+        data_conn.execute("CREATE INDEX VXX_option_chain_key ON VXX_option_chain (%s)" %
+                          ", ".join(sqlite_ingest.INDEX_COLUMNS))
+        data_conn.commit()
+        data_conn.close()
+
+        sqlite_ingest.ingest("VXX", self.data, self.path)
+        sqlite_ingest.ingest("VXX", self.data, self.path)
+
+        feed = SQLiteDataFeed(self.path)
+        self.assertEqual(len(self.data), len(feed.get("VXX")))
+        feed.close()
+
+    def test_ingest_without_rowid(self):
+        sqlite_ingest.ingest("VXX", self.data, self.path, without_rowid=True)
+        # ingesting the same quotes again replaces them
+        sqlite_ingest.ingest("VXX", self.data, self.path, without_rowid=True)
+
+        feed = SQLiteDataFeed(self.path)
+        data = feed.get("VXX")
+        feed.close()
+
+        self.assertEqual(len(self.data), len(data))
+
+        plan = self.query_plan("SELECT * FROM VXX_option_chain WHERE root = ? AND quote_date >= ?",
+                               ["VXX", '2016-02-17'])
+        self.assertIn("USING PRIMARY KEY", plan)
+
+    def test_ingest_csv_files(self):
+        csv = os.path.join(self.tmp_dir.name, "vxx.csv")
+        self.data.to_csv(csv, index=False)
+
+        sqlite_ingest.main(["VXX", csv, "--db", self.path])
+
+        data_conn = sqlite3.connect(self.path)
+        try:
+            count = data_conn.execute("SELECT COUNT(*) FROM VXX_option_chain").fetchone()[0]
+        finally:
+            data_conn.close()
+
+        self.assertEqual(len(self.data), count)
+
+    def test_append_new_quote_dates(self):
+        sqlite_ingest.ingest("VXX", self.data[self.data['quote_date'] < '2016-02-19'], self.path)
+
+        # the rows of quote dates already ingested are skipped
+        rows = sqlite_ingest.append("VXX", self.data[self.data['quote_date'] >= '2016-02-18'], self.path)
+        self.assertEqual(len(self.data[self.data['quote_date'] == '2016-02-19']), rows)
+        self.assertEqual(0, sqlite_ingest.append("VXX", self.data, self.path))
+
+        feed = SQLiteDataFeed(self.path)
+        data = feed.get("VXX")
+        feed.close()
+
+        self.assertEqual(len(self.data), len(data))
+
+    def test_append_invalidates_cache(self):
+        sqlite_ingest.ingest("VXX", self.data[self.data['quote_date'] < '2016-02-18'], self.path)
+
+        cache = CachedDataFeed(SQLiteDataFeed(self.path), os.path.join(self.tmp_dir.name, "cache"))
+        cache.get("VXX", end='2016-02-17')
+        cache.get("VXX", start='2016-02-17')
+
+        sqlite_ingest.append("VXX", self.data, self.path, cache=cache)
+
+        with mock.patch.object(cache.datafeed, 'get', wraps=cache.datafeed.get) as get:
+            cache.get("VXX", end='2016-02-17')
+            self.assertEqual(0, get.call_count)
+
+            data = cache.get("VXX", start='2016-02-17')
+            self.assertEqual(1, get.call_count)
+            self.assertEqual(DATES[1:], sorted(data['quote_date'].dt.strftime('%Y-%m-%d').unique()))
+
+        cache.close()
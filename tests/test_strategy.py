@@ -1,6 +1,43 @@
 from unittest import TestCase
 
+import pandas as pd
+
+from kaleidoscope.commissions import default_commissions
+from kaleidoscope.event import DataEvent
+from kaleidoscope.margin import tos_margin
+from kaleidoscope.strategy import Strategy
+
+
+class ScheduledStrategy(Strategy):
+    def on_init(self, **params):
+        self.days = list()
+        self.set_schedule(**params)
+
+    def on_data(self, data):
+        self.days.append(self.current_date.strftime("%Y-%m-%d"))
+
+
+def run(**schedule):
+    strategy = ScheduledStrategy(None, None, default_commissions, tos_margin, **schedule)
+
+    # 2016-02-15 is a Monday
+    for quote_date in pd.date_range('2016-02-15', '2016-02-26'):
+        strategy.on_data_event(DataEvent(quote_date, pd.DataFrame()))
+
+    return strategy.days
+
 
 class TestStrategy(TestCase):
     def test_place_order(self):
         self.fail()
+
+    def test_no_schedule(self):
+        self.assertEqual(12, len(run()))
+
+    def test_schedule_weekdays(self):
+        self.assertEqual(['2016-02-19', '2016-02-26'], run(weekdays=(4,)))
+
+    def test_schedule_rule(self):
+        # monthly expiration week
+        self.assertEqual(['2016-02-15', '2016-02-17', '2016-02-19'],
+                         run(weekdays=(0, 2, 4), rule=lambda quote_date: 15 <= quote_date.day <= 21))